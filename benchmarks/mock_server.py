@@ -0,0 +1,350 @@
+"""
+In-process aiohttp mock of toloka endpoints used by TolokaClient.
+"""
+import asyncio
+import random
+import time
+import uuid
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from aiohttp import web
+
+from toloka_api.codec import default_codec
+from toloka_api.constants import API_V1, TOO_MANY_REQUESTS
+
+START_DATE = datetime(2021, 1, 1)
+
+_codec = default_codec()
+
+
+def json_response(data, status: int = 200) -> web.Response:
+    return web.Response(body=_codec.dumps(data), status=status, content_type='application/json')
+
+
+@dataclass
+class MockConfig:
+    latency: float = 0.02
+    latency_jitter: float = 0.005
+    max_limit: int = 1000
+    throttle_rate: float = 0.0
+    operation_duration: float = 2.0
+    assigments: int = 20000
+    tasks: int = 20000
+    workers: int = 5000
+    pools: int = 50
+    solutions_per_assigment: int = 5
+
+
+def _date(seconds: float) -> str:
+    return (START_DATE + timedelta(seconds=seconds)).isoformat(timespec='milliseconds')
+
+
+class _Collection:
+    """Items sorted by id (and by created, they grow together) with cursor and date filters"""
+
+    def __init__(self, items: List[dict]):
+        self.items = items
+        self.ids = [item['id'] for item in items]
+        self.created = [item['created'] for item in items]
+        self.by_id = {item['id']: item for item in items}
+
+    def page(self, query) -> dict:
+        start, end = 0, len(self.items)
+        if 'created_gte' in query:
+            start = max(start, bisect_left(self.created, query['created_gte']))
+        if 'created_lt' in query:
+            end = min(end, bisect_left(self.created, query['created_lt']))
+        if 'id_gt' in query:
+            start = max(start, bisect_right(self.ids, query['id_gt']))
+        if 'id_lte' in query:
+            end = min(end, bisect_right(self.ids, query['id_lte']))
+        limit = int(query.get('limit', 50))
+        sort = query.get('sort', 'id')
+        items = self.items[start:end]
+        if 'status' in query:
+            items = [item for item in items if item.get('status') == query['status']]
+        if sort.startswith('-'):
+            items = items[::-1]
+        return {'items': items[:limit], 'has_more': len(items) > limit}
+
+
+class MockToloka:
+    """
+    Mock toloka server with configurable latency, page sizes, 429 injection and async operation duration.
+
+    Example:
+        async with MockToloka(MockConfig(latency=0.01)) as server:
+            client = TolokaClient('token', host=server.url)
+    """
+
+    def __init__(self, config: MockConfig = None, seed: int = 0):
+        self.config = config or MockConfig()
+        self.random = random.Random(seed)
+        self.url = ''
+        self.requests = 0
+        self.throttled = 0
+        self.operations: Dict[str, dict] = {}
+        self.paid_bonuses: List[dict] = []
+        self._runner: Optional[web.AppRunner] = None
+        self._generate()
+
+    def _generate(self):
+        config = self.config
+        self.assigments = _Collection([{
+            'id': f'{i:020x}--a',
+            'task_suite_id': f'{i:020x}--s',
+            'pool_id': '1',
+            'user_id': f'{i % config.workers:032x}',
+            'status': ('SUBMITTED', 'ACCEPTED', 'REJECTED')[i % 3],
+            'reward': 0.01,
+            'tasks': [{'id': f'{i:020x}--t{j}', 'input_values': {'image': f'https://example.com/{i}/{j}.png'}}
+                      for j in range(config.solutions_per_assigment)],
+            'solutions': [{'output_values': {'result': 'OK'}} for _ in range(config.solutions_per_assigment)],
+            'created': _date(i * 10),
+            'submitted': _date(i * 10 + 60),
+        } for i in range(config.assigments)])
+        self.tasks = _Collection([{
+            'id': f'{i:020x}--t',
+            'pool_id': '1',
+            'overlap': 3,
+            'input_values': {'image': f'https://example.com/{i}.png'},
+            'created': _date(i),
+        } for i in range(config.tasks)])
+        self.pools = _Collection([{
+            'id': str(i),
+            'project_id': 1,
+            'private_name': f'pool {i}',
+            'status': 'OPEN',
+            'priority': 0,
+            'created': _date(i),
+        } for i in range(1, config.pools + 1)])
+        self.workers = [{'id': f'{i:032x}', 'assignments_count': i % 100} for i in range(config.workers)]
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0) -> str:
+        app = web.Application(middlewares=[self._middleware], client_max_size=1024**3)
+        self._routes(app)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]  # type: ignore
+        self.url = f'http://{host}:{port}'
+        return self.url
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+
+    def _routes(self, app: web.Application):
+        add = app.router.add_route
+        add('GET', API_V1.ASSIGMENTS, self._list(lambda: self.assigments))
+        add('PATCH', API_V1.ASSIGMENTS + '/{id}', self._patch_assigment)
+        add('GET', API_V1.TASKS, self._list(lambda: self.tasks))
+        add('POST', API_V1.TASKS, self._create_tasks)
+        add('GET', API_V1.TASKS + '/{id}', self._get(lambda: self.tasks))
+        add('PATCH', API_V1.TASKS + '/{id}', self._patch(lambda: self.tasks))
+        add('GET', API_V1.TASK_SUITES, self._list(lambda: self.tasks))
+        add('PATCH', API_V1.TASK_SUITES + '/{id}', self._patch(lambda: self.tasks))
+        add('GET', API_V1.POOLS, self._list(lambda: self.pools))
+        add('GET', API_V1.POOLS + '/{id}', self._get(lambda: self.pools))
+        add('PUT', API_V1.POOLS + '/{id}', self._patch(lambda: self.pools))
+        add('POST', API_V1.POOLS + '/{id}/{action}', self._pool_action)
+        add('GET', API_V1.WORKERS, self._workers)
+        add('GET', API_V1.OPERATIONS + '/{id}', self._operation)
+        add('GET', API_V1.OPERATIONS + '/{id}/log', self._operation_log)
+        add('POST', API_V1.BONUS, self._send_bonus)
+        add('POST', API_V1.AGGREGATE, self._aggregate)
+        add('GET', API_V1.AGGREGATED_SOLUTIONS + '{tail:.*}', self._aggregated_solutions)
+        add('POST', API_V1.ANALYTICS, self._analytics)
+        add('GET', API_V1.BALANCE, self._balance)
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler):
+        self.requests += 1
+        config = self.config
+        await asyncio.sleep(max(0.0, config.latency + self.random.uniform(-1, 1) * config.latency_jitter))
+        if config.throttle_rate and self.random.random() < config.throttle_rate:
+            self.throttled += 1
+            return json_response({'code': TOO_MANY_REQUESTS}, status=429)
+        return await handler(request)
+
+    def _list(self, collection):
+
+        async def handler(request: web.Request):
+            query = dict(request.query)
+            query['limit'] = str(min(int(query.get('limit', 50)), self.config.max_limit))
+            return json_response(collection().page(query))
+
+        return handler
+
+    def _get(self, collection):
+
+        async def handler(request: web.Request):
+            item = collection().by_id.get(request.match_info['id'])
+            if item is None:
+                return json_response({'code': 'DOES_NOT_EXIST'}, status=404)
+            return json_response(item)
+
+        return handler
+
+    def _patch(self, collection):
+
+        async def handler(request: web.Request):
+            item = collection().by_id.get(request.match_info['id'])
+            if item is None:
+                return json_response({'code': 'DOES_NOT_EXIST'}, status=404)
+            item.update(await request.json())
+            return json_response(item)
+
+        return handler
+
+    async def _patch_assigment(self, request: web.Request):
+        item = self.assigments.by_id.get(request.match_info['id'])
+        if item is None:
+            return json_response({'code': 'DOES_NOT_EXIST'}, status=404)
+        if item['status'] != 'SUBMITTED':
+            return json_response({'code': 'CONFLICT_STATE'}, status=409)
+        item.update(await request.json())
+        return json_response(item)
+
+    async def _pool_action(self, request: web.Request):
+        pool = self.pools.by_id.get(request.match_info['id'])
+        if pool is None:
+            return json_response({'code': 'DOES_NOT_EXIST'}, status=404)
+        action = request.match_info['action']
+        if action == 'clone':
+            return json_response(self._start_operation('POOL.CLONE', 1, {'pool_id': pool['id']}), status=202)
+        pool['status'] = {'open': 'OPEN', 'close': 'CLOSED', 'archive': 'ARCHIVED'}.get(action, pool['status'])
+        return json_response(self._start_operation(f'POOL.{action.upper()}', 1, {'pool_id': pool['id']}),
+                             status=202)
+
+    async def _workers(self, request: web.Request):
+        size = int(request.query.get('size', 100))
+        page = int(request.query.get('page', 0))
+        return json_response({
+            'content': self.workers[page * size:(page + 1) * size],
+            'totalPages': -(-len(self.workers) // size),
+            'totalElements': len(self.workers),
+        })
+
+    def _start_operation(self, operation_type: str, items_count: int, details: dict = None,
+                         operation_id: str = None) -> dict:
+        now = time.monotonic()
+        operation = {
+            'id': operation_id or str(uuid.uuid4()),
+            'type': operation_type,
+            'status': 'PENDING',
+            'submitted': datetime.utcnow().isoformat(timespec='milliseconds'),
+            'details': {'items_count': items_count, **(details or {})},
+            '_started': now,
+            '_items': items_count,
+        }
+        self.operations[operation['id']] = operation
+        return self._operation_view(operation)
+
+    def _operation_view(self, operation: dict) -> dict:
+        elapsed = time.monotonic() - operation['_started']
+        duration = self.config.operation_duration
+        if elapsed >= duration:
+            operation['status'] = 'SUCCESS'
+            operation['progress'] = 100
+        elif elapsed > 0:
+            operation['status'] = 'RUNNING'
+            operation['progress'] = int(elapsed / duration * 100)
+        return {key: value for key, value in operation.items() if not key.startswith('_')}
+
+    async def _create_tasks(self, request: web.Request):
+        tasks = await request.json()
+        if not isinstance(tasks, list):
+            tasks = [tasks]
+        if request.query.get('async_mode') == 'true':
+            operation_id = request.query.get('operation_id')
+            if operation_id in self.operations:
+                return json_response({'code': 'CONFLICT'}, status=409)
+            operation = self._start_operation('TASK.BATCH_CREATE', len(tasks), operation_id=operation_id)
+            return json_response(operation, status=202)
+        return json_response({'items': {str(i): {**task, 'id': str(uuid.uuid4())} for i, task in enumerate(tasks)}})
+
+    async def _send_bonus(self, request: web.Request):
+        bonuses = await request.json()
+        operation_id = request.query.get('operation_id')
+        if operation_id in self.operations:
+            return json_response({'code': 'CONFLICT'}, status=409)
+        operation = self._start_operation('USER_BONUS.BATCH_CREATE', len(bonuses), operation_id=operation_id)
+        log = []
+        for bonus in bonuses:
+            valid = not str(bonus.get('user_id')).startswith('invalid')
+            if valid:
+                self.paid_bonuses.append(bonus)
+            log.append({
+                'type': 'USER_BONUS.BATCH_CREATE',
+                'success': valid,
+                'input': bonus,
+                'output': {'id': str(uuid.uuid4())} if valid else {'code': 'USER_NOT_FOUND'},
+            })
+        self.operations[operation['id']]['_log'] = log
+        return json_response(operation, status=202)
+
+    async def _operation(self, request: web.Request):
+        operation = self.operations.get(request.match_info['id'])
+        if operation is None:
+            return json_response({'code': 'DOES_NOT_EXIST'}, status=404)
+        return json_response(self._operation_view(operation))
+
+    async def _operation_log(self, request: web.Request):
+        operation = self.operations.get(request.match_info['id'])
+        if operation is None:
+            return json_response({'code': 'DOES_NOT_EXIST'}, status=404)
+        if '_log' in operation:
+            return json_response(operation['_log'])
+        return json_response([{
+            'type': operation['type'],
+            'success': True,
+            'output': {'id': f'{operation["id"]}-{i}'},
+        } for i in range(operation['_items'])])
+
+    async def _aggregate(self, request: web.Request):
+        pool_id = (await request.json()).get('pool_id')
+        if str(pool_id) not in self.pools.by_id:
+            return json_response({'code': 'DOES_NOT_EXIST'}, status=404)
+        operation = self._start_operation('SOLUTION.AGGREGATE', len(self.tasks.items), {'pool_id': pool_id})
+        return json_response(operation, status=202)
+
+    async def _aggregated_solutions(self, request: web.Request):
+        operation_id = request.match_info['tail'].strip('/')
+        if operation_id not in self.operations:
+            return json_response({'code': 'DOES_NOT_EXIST'}, status=404)
+        limit = min(int(request.query.get('limit', 50)), self.config.max_limit)
+        start = bisect_right(self.tasks.ids, request.query['task_id_gt']) if 'task_id_gt' in request.query else 0
+        pool_id = self.operations[operation_id]['details'].get('pool_id')
+        items = [{
+            'pool_id': pool_id,
+            'task_id': task_id,
+            'confidence': 0.9,
+            'output_values': {'result': 'OK'},
+        } for task_id in self.tasks.ids[start:start + limit]]
+        return json_response({'items': items, 'has_more': start + limit < len(self.tasks.ids)})
+
+    async def _analytics(self, request: web.Request):
+        queries = await request.json()
+        value = [{
+            'request': query,
+            'result': {
+                'value': len(self.assigments.items) if query['subject_id'] in self.pools.by_id else None
+            },
+            'finished': True,
+        } for query in queries]
+        return json_response(self._start_operation('ANALYTICS', len(queries), {'value': value}), status=202)
+
+    async def _balance(self, request: web.Request):
+        return json_response({'balance': 1000.0, 'amount': 1000.0})
@@ -0,0 +1,205 @@
+"""
+Offline benchmarks of TolokaClient against in-process mock server.
+
+    python -m benchmarks.run
+    python -m benchmarks.run --scenario get_all_assigments --items 100000 --latency 0.05 --throttle-rate 0.05
+
+Every scenario runs in its own subprocess, so peak RSS is measured per scenario.
+"""
+import argparse
+import asyncio
+import json
+import resource
+import subprocess
+import sys
+import time
+from dataclasses import asdict, fields
+from typing import Awaitable, Callable, Dict, List
+
+from benchmarks.mock_server import MockConfig, MockToloka
+from toloka_api import RateLimiter, RequestMetrics, ResponseDecoder, TolokaClient
+from toloka_api.constants import API_V1
+
+# asigment keys kept by ResponseDecoder with --offload
+OFFLOAD_FIELDS = ('user_id', 'status', 'submitted')
+
+
+async def get_all_assigments(client: TolokaClient, server: MockToloka) -> int:
+    return len(await client.get_all_assigments(1))
+
+
+async def get_workers(client: TolokaClient, server: MockToloka) -> int:
+    return len(await client.get_workers())
+
+
+async def batch_upload_tasks(client: TolokaClient, server: MockToloka) -> int:
+    tasks = [{
+        'pool_id': 1,
+        'input_values': {
+            'image': f'https://example.com/{i}.png'
+        }
+    } for i in range(server.config.tasks)]
+    await client.batch_upload_tasks(tasks)
+    return len(tasks)
+
+
+async def upload_tasks(client: TolokaClient, server: MockToloka) -> int:
+    tasks = ({
+        'pool_id': 1,
+        'input_values': {
+            'image': f'https://example.com/{i}.png'
+        }
+    } for i in range(server.config.tasks))
+    report = await client.upload_tasks(tasks, chunk_size=max(1, server.config.tasks // 8))
+    return report['success_count']
+
+
+async def send_bonus_users(client: TolokaClient, server: MockToloka) -> int:
+    user_links = [assigment['user_id'] for assigment in server.assigments.items]
+    await client.send_bonus_users(user_links, 0.01, {'title': 'Bonus', 'body': 'Thank you!'})
+    return len(user_links)
+
+
+async def get_aggregated_solutions(client: TolokaClient, server: MockToloka) -> int:
+    return len(await client.get_aggregated_solutions(1, 1, ['result']))
+
+
+async def iter_pools_aggregated_solutions(client: TolokaClient, server: MockToloka) -> int:
+    specs = [(int(pool['id']), 1, ['result']) for pool in server.pools.items]
+    return sum([len(page) async for _, page in client.iter_pools_aggregated_solutions(specs, pages=True)])
+
+
+SCENARIOS: Dict[str, Callable[[TolokaClient, MockToloka], Awaitable[int]]] = {
+    'get_all_assigments': get_all_assigments,
+    'get_workers': get_workers,
+    'batch_upload_tasks': batch_upload_tasks,
+    'upload_tasks': upload_tasks,
+    'send_bonus_users': send_bonus_users,
+    'get_aggregated_solutions': get_aggregated_solutions,
+    'iter_pools_aggregated_solutions': iter_pools_aggregated_solutions,
+}
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def peak_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1024**2 if sys.platform == 'darwin' else rss / 1024
+
+
+async def measure_loop_lag(lags: List[float], interval: float = 0.01):
+    while True:
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - started - interval)
+
+
+async def run_scenario(name: str, config: MockConfig, rate: float, offload: bool = False) -> dict:
+    latencies: List[float] = []
+    lags: List[float] = []
+    metrics = RequestMetrics([lambda record: latencies.append(record.total)])
+    decoder = ResponseDecoder(fields={API_V1.ASSIGMENTS: OFFLOAD_FIELDS}) if offload else None
+    async with MockToloka(config) as server:
+        async with TolokaClient('token', host=server.url, rate_limiter=RateLimiter(rate), metrics=metrics,
+                                decoder=decoder) as client:
+            lag_meter = asyncio.ensure_future(measure_loop_lag(lags))
+            started = time.perf_counter()
+            items = await SCENARIOS[name](client, server)
+            elapsed = time.perf_counter() - started
+            lag_meter.cancel()
+    return {
+        'scenario': name,
+        'elapsed': elapsed,
+        'requests': server.requests,
+        'throttled': server.throttled,
+        'items': items,
+        'requests_per_second': server.requests / elapsed,
+        'items_per_second': items / elapsed,
+        'p50': percentile(latencies, 0.5),
+        'p99': percentile(latencies, 0.99),
+        'loop_lag_max': max(lags, default=0.0),
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def format_report(results: List[dict]) -> str:
+    header = f'{"scenario":<34}{"time, s":>9}{"requests":>10}{"429":>6}{"req/s":>9}{"items/s":>11}' \
+             f'{"p50, ms":>9}{"p99, ms":>9}{"lag, ms":>9}{"rss, MB":>9}'
+    lines = [header, '-' * len(header)]
+    for r in results:
+        lines.append(f'{r["scenario"]:<34}{r["elapsed"]:>9.2f}{r["requests"]:>10}{r["throttled"]:>6}'
+                     f'{r["requests_per_second"]:>9.1f}{r["items_per_second"]:>11.1f}'
+                     f'{r["p50"] * 1000:>9.1f}{r["p99"] * 1000:>9.1f}{r["loop_lag_max"] * 1000:>9.1f}'
+                     f'{r["peak_rss_mb"]:>9.1f}')
+    return '\n'.join(lines)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    defaults = MockConfig()
+    parser = argparse.ArgumentParser(description='Offline TolokaClient benchmarks against local mock server')
+    parser.add_argument('--scenario', action='append', choices=list(SCENARIOS), help='default: all scenarios')
+    parser.add_argument('--items', type=int, help='number of assigments and tasks')
+    for field in fields(MockConfig):
+        parser.add_argument(f'--{field.name.replace("_", "-")}', type=field.type, default=getattr(defaults, field.name))
+    parser.add_argument('--rate', type=float, default=20.0, help='client rate limit, requests per second')
+    parser.add_argument('--offload',
+                        action='store_true',
+                        help='decode big asigment pages with ResponseDecoder, keeping only OFFLOAD_FIELDS')
+    parser.add_argument('--json', help='write results to json file')
+    parser.add_argument('--in-process', action='store_true', help='run scenarios in this process, rss is shared')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.items is not None:
+        args.assigments = args.tasks = args.items
+    return args
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    args = parse_args(argv)
+    config = MockConfig(**{field.name: getattr(args, field.name) for field in fields(MockConfig)})
+    scenarios = args.scenario or list(SCENARIOS)
+
+    if args.worker:
+        print(json.dumps(asyncio.run(run_scenario(scenarios[0], config, args.rate, args.offload))))
+        return
+
+    results = []
+    for name in scenarios:
+        if args.in_process:
+            result = asyncio.run(run_scenario(name, config, args.rate, args.offload))
+        else:
+            worker_argv = [arg for arg in argv if arg != '--in-process']
+            worker_argv = [*_without_option(worker_argv, '--scenario'), '--scenario', name, '--worker']
+            output = subprocess.run([sys.executable, '-m', 'benchmarks.run', *worker_argv],
+                                    check=True,
+                                    stdout=subprocess.PIPE).stdout
+            result = json.loads(output.decode().strip().splitlines()[-1])
+        results.append(result)
+        print(format_report([result]).splitlines()[-1] if len(results) > 1 else format_report([result]), flush=True)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'config': asdict(config), 'rate': args.rate, 'results': results}, f, indent=2)
+
+
+def _without_option(argv: List[str], option: str) -> List[str]:
+    result = []
+    skip = False
+    for arg in argv:
+        if skip:
+            skip = False
+        elif arg == option:
+            skip = True
+        elif not arg.startswith(f'{option}='):
+            result.append(arg)
+    return result
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,20 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Tuple
+
+from benchmarks.mock_server import MockConfig, MockToloka
+from toloka_api import RateLimiter, TolokaClient
+
+
+def mock_config(**kwargs) -> MockConfig:
+    """Small mock answering without latency"""
+    defaults = dict(latency=0, latency_jitter=0, operation_duration=0.05, assigments=1000, tasks=1000, workers=100)
+    return MockConfig(**{**defaults, **kwargs})
+
+
+@asynccontextmanager
+async def mock_client(config: MockConfig = None, **kwargs) -> AsyncIterator[Tuple[MockToloka, TolokaClient]]:
+    """Mock toloka server and client talking to it without rate limit"""
+    kwargs.setdefault('rate_limiter', RateLimiter(rate=10000))
+    async with MockToloka(config or mock_config()) as server:
+        async with TolokaClient('token', host=server.url, **kwargs) as client:
+            yield server, client
@@ -0,0 +1,95 @@
+import asyncio
+import json
+from typing import Optional
+
+import aiohttp
+from multidict import CIMultiDict
+
+from toloka_api import OperationWatcher, TolokaClient
+from toloka_api.constants import API_V1, BonusResult
+
+
+class LostResponseTransport:
+    """
+    Fake toloka answering bonus and operation requests without network.
+    First `lost` bonus responses are lost and their operation is registered later, like a slow toloka would do,
+    or never if register_delay is None.
+    """
+
+    def __init__(self, register_delay: Optional[float] = 0.05, lost: int = 1):
+        self.register_delay = register_delay
+        self.lost = lost
+        self.operations: dict = {}
+        self.payouts: list = []
+        self.bonus_requests: list = []
+
+    def _register(self, operation_id: str, bonuses: list):
+        self.operations[operation_id] = {'id': operation_id, 'type': 'USER_BONUS.BATCH_CREATE', 'status': 'SUCCESS'}
+        self.payouts.extend(bonuses)
+
+    async def request(self, method, path, params, data, send):
+        if method == 'POST' and path == API_V1.BONUS:
+            operation_id = params['operation_id']
+            self.bonus_requests.append(operation_id)
+            if operation_id in self.operations:
+                return self._response({'code': 'CONFLICT'}, 409)
+            bonuses = json.loads(data)
+            if len(self.bonus_requests) <= self.lost:
+                if self.register_delay is not None:
+                    loop = asyncio.get_running_loop()
+                    loop.call_later(self.register_delay, self._register, operation_id, bonuses)
+                raise aiohttp.ClientConnectionError('response is lost')
+            self._register(operation_id, bonuses)
+            return self._response(self.operations[operation_id], 202)
+        operation_id = path[len(API_V1.OPERATIONS) + 1:].split('/')[0]
+        operation = self.operations.get(operation_id)
+        if operation is None:
+            return self._response({'code': 'DOES_NOT_EXIST'}, 404)
+        if path.endswith('/log'):
+            return self._response([{'success': True, 'output': {'id': operation_id}}], 200)
+        return self._response(operation, 200)
+
+    @staticmethod
+    def _response(body, status: int):
+        return status, CIMultiDict({'Content-Type': 'application/json'}), json.dumps(body).encode()
+
+    def close(self):
+        pass
+
+
+async def send_bonuses(transport: LostResponseTransport) -> dict:
+    async with TolokaClient('token', host='http://toloka.test', transport=transport) as client:
+        client.operations = OperationWatcher(client.get_operation_info, min_interval=0.01, not_found_timeout=0.2)
+        return await client.send_bonuses([{'user_id': 'user', 'amount': 0.5}])
+
+
+def test_send_bonuses_lost_response_is_not_paid_twice():
+    transport = LostResponseTransport()
+    report = asyncio.run(send_bonuses(transport))
+
+    assert len(transport.payouts) == 1
+    assert len(set(transport.bonus_requests)) == 1
+    assert report['paid_count'] == 1
+    assert report['items'][0]['status'] == BonusResult.PAID
+    assert report['items'][0]['operation_id'] == transport.bonus_requests[0]
+
+
+def test_send_bonuses_not_created_operation_is_resent_with_same_id():
+    transport = LostResponseTransport(register_delay=None)
+    report = asyncio.run(send_bonuses(transport))
+
+    assert len(transport.payouts) == 1
+    assert len(transport.bonus_requests) == 2
+    assert len(set(transport.bonus_requests)) == 1
+    assert report['paid_count'] == 1
+
+
+def test_send_bonuses_never_found_operation_is_unknown():
+    transport = LostResponseTransport(register_delay=None, lost=3)
+    report = asyncio.run(send_bonuses(transport))
+
+    assert transport.payouts == []
+    assert len(set(transport.bonus_requests)) == 1
+    assert report['unknown_count'] == 1
+    assert report['items'][0]['status'] == BonusResult.UNKNOWN
+    assert report['items'][0]['operation_id'] == transport.bonus_requests[0]
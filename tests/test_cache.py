@@ -0,0 +1,33 @@
+import asyncio
+
+from tests.mock import mock_client
+from toloka_api import ResponseCache
+
+
+def test_write_invalidates_cached_resource():
+
+    async def run():
+        async with mock_client(cache=ResponseCache()) as (server, client):
+            await client.get_pool(1)
+            await client.get_pool(1)
+            cached_requests = server.requests
+            await client.change_pool_name(1, 'renamed')
+            pool = await client.get_pool(1)
+            return cached_requests, server.requests, pool
+
+    cached_requests, requests, pool = asyncio.run(run())
+
+    assert cached_requests == 1
+    assert requests == 3
+    assert pool['private_name'] == 'renamed'
+
+
+def test_list_pages_are_not_cached():
+
+    async def run():
+        async with mock_client(cache=ResponseCache()) as (server, client):
+            await client.get_all_tasks(1, limit=100)
+            await client.get_all_tasks(1, limit=100)
+            return server.requests
+
+    assert asyncio.run(run()) == 2 * 10
@@ -0,0 +1,49 @@
+import asyncio
+
+from toloka_api import RequestCoalescer
+
+
+class SlowRequest:
+    def __init__(self):
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        return {'x': 1}
+
+
+def test_cancelled_callers_are_not_sent_again():
+    request = SlowRequest()
+
+    async def run():
+        coalescer = RequestCoalescer()
+        callers = [asyncio.ensure_future(coalescer.run('key', request)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        for caller in callers:
+            caller.cancel()
+        results = await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.sleep(0.1)
+        return results
+
+    results = asyncio.run(run())
+
+    assert all(isinstance(result, asyncio.CancelledError) for result in results)
+    assert request.calls == 1
+
+
+def test_waiting_callers_resend_after_first_caller_is_cancelled():
+    request = SlowRequest()
+
+    async def run():
+        coalescer = RequestCoalescer()
+        callers = [asyncio.ensure_future(coalescer.run('key', request)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        callers[0].cancel()
+        return await asyncio.gather(*callers, return_exceptions=True)
+
+    results = asyncio.run(run())
+
+    assert isinstance(results[0], asyncio.CancelledError)
+    assert results[1:] == [{'x': 1}, {'x': 1}]
+    assert request.calls == 2
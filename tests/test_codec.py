@@ -0,0 +1,14 @@
+import json
+
+import numpy as np
+
+from toloka_api import JsonCodec, OrjsonCodec
+
+
+def test_orjson_codec_dumps_what_stdlib_json_does():
+    obj = {'amount': np.float64(0.1), 1: 'key', 'user_id': 'a'}
+    assert json.loads(OrjsonCodec().dumps(obj)) == json.loads(JsonCodec().dumps(obj))
+
+
+def test_orjson_codec_dumps_numpy_values():
+    assert json.loads(OrjsonCodec().dumps({'count': np.int64(3), 'ids': np.arange(2)})) == {'count': 3, 'ids': [0, 1]}
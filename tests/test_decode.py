@@ -0,0 +1,18 @@
+import asyncio
+
+from tests.mock import mock_client
+from toloka_api import ResponseDecoder
+from toloka_api.constants import API_V1
+
+
+def test_projected_pages_keep_cursor_keys():
+
+    async def get_all_assigments():
+        decoder = ResponseDecoder(threshold=0, workers=1, fields={API_V1.ASSIGMENTS: ('status', )})
+        async with mock_client(decoder=decoder) as (server, client):
+            return await client.get_all_assigments(1, limit=100)
+
+    assigments = asyncio.run(get_all_assigments())
+
+    assert len(assigments) == 1000
+    assert set(assigments[0]) == {'id', 'status'}
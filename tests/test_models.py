@@ -0,0 +1,23 @@
+from toloka_api import AssigmentBatch
+from toloka_api.constants import AssigmentStatus
+
+
+def test_assigment_batch_keeps_all_fields():
+    item = {
+        'id': 'a1',
+        'task_suite_id': 's1',
+        'pool_id': '21',
+        'user_id': 'u1',
+        'status': AssigmentStatus.ACCEPTED,
+        'reward': 0.5,
+        'public_comment': 'ok',
+        'submitted': '2021-01-01T00:00:01',
+        'solutions': [{'output_values': {'result': 'OK'}}],
+    }
+    batch = AssigmentBatch([item, {'id': 'a2'}])
+
+    assert len(batch) == 2
+    assert batch.status_counts()[AssigmentStatus.ACCEPTED] == 1
+    assert batch[0].to_dict() == {**item, 'pool_id': 21}
+    assert batch[0].solutions == item['solutions']
+    assert batch[1].status is None and batch[1].rest == {}
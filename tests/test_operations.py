@@ -0,0 +1,28 @@
+import asyncio
+
+import pytest
+
+from tests.mock import mock_client
+from toloka_api import OperationNotFoundError, OperationWatcher
+
+
+def test_watcher_raises_not_found_for_unknown_operation():
+
+    async def wait():
+        async with mock_client() as (server, client):
+            watcher = OperationWatcher(client.get_operation_info, min_interval=0.01, not_found_timeout=0.1)
+            await watcher.wait('unknown')
+
+    with pytest.raises(OperationNotFoundError):
+        asyncio.run(wait())
+
+
+def test_watcher_waits_for_operation():
+
+    async def wait():
+        async with mock_client() as (server, client):
+            client.operations = OperationWatcher(client.get_operation_info, min_interval=0.01)
+            operation = await client.clone_pool(1)
+            return await client.wait_operation(operation['id'])
+
+    assert asyncio.run(wait())['status'] == 'SUCCESS'
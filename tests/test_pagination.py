@@ -0,0 +1,17 @@
+import asyncio
+
+from tests.mock import mock_client, mock_config
+
+
+def test_partitioned_scan_returns_same_tasks_as_sequential_one():
+
+    async def scan():
+        async with mock_client(mock_config(tasks=5000)) as (server, client):
+            sequential = await client.get_all_tasks(1, limit=100)
+            partitioned = [task async for task in client.iter_tasks_partitioned(1, shards=4, limit=100)]
+            return sequential, partitioned
+
+    sequential, partitioned = asyncio.run(scan())
+
+    assert len(sequential) == 5000
+    assert sorted(task['id'] for task in partitioned) == [task['id'] for task in sequential]
@@ -0,0 +1,38 @@
+import asyncio
+
+from tests.mock import mock_client, mock_config
+from toloka_api import RateLimiter, RequestPriority
+
+
+async def completion_order(priority_weights=None) -> list:
+    order = []
+
+    async def call(name, request):
+        await request
+        order.append(name)
+
+    limiter = RateLimiter(rate=10000, max_concurrency=1)
+    async with mock_client(mock_config(latency=0.01), rate_limiter=limiter,
+                           priority_weights=priority_weights) as (server, client):
+        # different params, so requests are not coalesced into one
+        calls = [
+            asyncio.ensure_future(call('bulk', client.get_task_list({'pool_id': 1, 'limit': 10, 'id_gt': i})))
+            for i in range(10)
+        ]
+        with client.priority(RequestPriority.INTERACTIVE):
+            calls.extend(asyncio.ensure_future(call('interactive', client.get_pool(i))) for i in range(1, 6))
+        await asyncio.gather(*calls)
+    return order
+
+
+def test_interactive_requests_go_before_queued_bulk_pages():
+    order = asyncio.run(completion_order())
+
+    assert order[:6].count('interactive') == 5
+
+
+def test_equal_weights_interleave_priorities():
+    weights = {RequestPriority.INTERACTIVE: 1.0, RequestPriority.NORMAL: 1.0, RequestPriority.BULK: 1.0}
+    order = asyncio.run(completion_order(weights))
+
+    assert order[:6].count('interactive') < 5
@@ -0,0 +1,19 @@
+import asyncio
+
+from tests.mock import mock_client, mock_config
+from toloka_api import AssigmentStore
+
+
+def test_second_sync_returns_nothing_new():
+
+    async def sync():
+        async with mock_client(mock_config(assigments=2500)) as (server, client):
+            store = AssigmentStore(':memory:')
+            first = await client.sync_assigments(1, store)
+            second = await client.sync_assigments(1, store)
+            return first, second
+
+    first, second = asyncio.run(sync())
+
+    assert len(first) == 2500
+    assert second == []
@@ -1,6 +1,54 @@
 # type: ignore[attr-defined]
 """library to work with https://toloka.yandex.ru"""
 
+from toloka_api.analytics import AssigmentStats
+from toloka_api.cache import ResponseCache, SqliteBackend
+from toloka_api.cassette import RecordTransport, ReplayTransport
 from toloka_api.clients.async_client import TolokaClient
+from toloka_api.coalesce import RequestCoalescer
+from toloka_api.codec import JsonCodec, OrjsonCodec
+from toloka_api.constants import RequestPriority
+from toloka_api.decode import ResponseDecoder
+from toloka_api.exceptions import (CassetteError, OperationNotFoundError, OperationTimeoutError, RequestError,
+                                   TolokaError)
+from toloka_api.metrics import RequestMetrics
+from toloka_api.models import Assigment, AssigmentBatch, Pool, Task
+from toloka_api.monitor import AnalyticsMonitor
+from toloka_api.operations import OperationWatcher
+from toloka_api.rate_limit import RateLimiter
+from toloka_api.retry import RetryPolicy
+from toloka_api.scheduler import RequestScheduler, request_priority
+from toloka_api.session import ConnectionSettings
+from toloka_api.sync import AssigmentStore
 
-__all__ = ['TolokaClient']
+__all__ = [
+    'TolokaClient',
+    'AnalyticsMonitor',
+    'Assigment',
+    'AssigmentBatch',
+    'AssigmentStats',
+    'AssigmentStore',
+    'Pool',
+    'Task',
+    'ConnectionSettings',
+    'JsonCodec',
+    'OrjsonCodec',
+    'OperationWatcher',
+    'RateLimiter',
+    'RecordTransport',
+    'ReplayTransport',
+    'RequestCoalescer',
+    'RequestMetrics',
+    'RequestPriority',
+    'RequestScheduler',
+    'ResponseDecoder',
+    'ResponseCache',
+    'RetryPolicy',
+    'SqliteBackend',
+    'CassetteError',
+    'OperationNotFoundError',
+    'OperationTimeoutError',
+    'RequestError',
+    'TolokaError',
+    'request_priority',
+]
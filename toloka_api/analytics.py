@@ -0,0 +1,197 @@
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from toloka_api.constants import AVG_SUBMIT_ASSIGNMENT_MILLIS, UNIQUE_SUBMITTERS_COUNT, AssigmentStatus
+from toloka_api.models import ASSIGMENT_STATUSES, AssigmentBatch, parse_timestamp
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+TIME_FIELDS = ('created', 'submitted', 'accepted', 'rejected')
+
+_STATUS_INDEX = {status: i for i, status in enumerate(ASSIGMENT_STATUSES)}
+_ACCEPTED = _STATUS_INDEX[AssigmentStatus.ACCEPTED]
+_REJECTED = _STATUS_INDEX[AssigmentStatus.REJECTED]
+
+
+def _timestamps(values: Sequence[Optional[str]]) -> Any:
+    """Toloka date strings to float unix timestamps, NaN for missing ones"""
+    try:
+        dates = np.array([value.rstrip('Z') if value else 'NaT' for value in values], dtype='datetime64[ms]')
+    except ValueError:
+        return np.array([parse_timestamp(value) or np.nan for value in values], dtype=np.float64)
+    timestamps = dates.astype(np.int64) / 1000.0
+    timestamps[np.isnat(dates)] = np.nan
+    return timestamps
+
+
+def _rate(part: Any, total: Any) -> Any:
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(total > 0, part / np.maximum(total, 1), np.nan)
+
+
+def _value(value: Any) -> Optional[float]:
+    return None if value != value else float(value)
+
+
+class AssigmentStats:
+    """
+    Per pool and per worker assigment statistics computed with numpy. Needs numpy.
+
+    Assigments are added page by page and kept as numpy columns, one row per assigment id,
+    so an assigment seen again (e.g. accepted after it was submitted) replaces its old row.
+    Metrics are computed over all rows on request, which takes milliseconds for millions of assigments.
+
+    Example:
+        stats = AssigmentStats()
+        async for page in client.iter_assigments(pool_id, pages=True):
+            stats.update(page)
+        stats.pool_stats()[pool_id][AVG_SUBMIT_ASSIGNMENT_MILLIS]
+    """
+
+    def __init__(self, capacity: int = 1024):
+        if np is None:
+            raise ImportError('AssigmentStats needs numpy')
+        self.worker_ids: List[str] = []
+        self._workers: Dict[str, int] = {}
+        self._rows: Dict[str, int] = {}
+        self._size = 0
+        self._pools = np.zeros(capacity, np.int64)
+        self._worker_rows = np.zeros(capacity, np.int64)
+        self._statuses = np.full(capacity, -1, np.int8)
+        self._times = {name: np.full(capacity, np.nan) for name in TIME_FIELDS}
+
+    def __len__(self) -> int:
+        return self._size
+
+    def update(self, items: Iterable[dict]):
+        """Add or replace assigments from a page of toloka json"""
+        items = list(items)
+        if not items:
+            return
+        rows = self._get_rows([str(item['id']) for item in items])
+        self._pools[rows] = [int(item.get('pool_id') or 0) for item in items]
+        self._worker_rows[rows] = self._get_workers([item.get('user_id') for item in items])
+        self._statuses[rows] = [_STATUS_INDEX.get(item.get('status'), -1) for item in items]
+        for name, column in self._times.items():
+            column[rows] = _timestamps([item.get(name) for item in items])
+
+    def update_batch(self, batch: AssigmentBatch):
+        """Add or replace assigments from AssigmentBatch, its columns are copied without per item work"""
+        if not len(batch):
+            return
+        rows = self._get_rows(batch.ids)
+        self._pools[rows] = np.frombuffer(batch.pool_ids, np.int64)
+        self._worker_rows[rows] = self._get_workers(batch.user_ids)
+        self._statuses[rows] = np.frombuffer(batch.statuses, np.int8)
+        for name, column in self._times.items():
+            column[rows] = np.frombuffer(batch.times[name], np.float64)
+
+    def _get_rows(self, ids: Sequence[str]) -> Any:
+        rows = self._rows
+        result = np.empty(len(ids), np.int64)
+        for i, assigment_id in enumerate(ids):
+            row = rows.get(assigment_id)
+            if row is None:
+                row = rows[assigment_id] = self._size
+                self._size += 1
+            result[i] = row
+        self._reserve(self._size)
+        return result
+
+    def _get_workers(self, user_ids: Sequence[Optional[str]]) -> List[int]:
+        workers = self._workers
+        result = []
+        for user_id in user_ids:
+            row = workers.get(user_id)  # type: ignore
+            if row is None:
+                row = workers[user_id] = len(self.worker_ids)  # type: ignore
+                self.worker_ids.append(user_id)  # type: ignore
+            result.append(row)
+        return result
+
+    def _reserve(self, size: int):
+        capacity = len(self._pools)
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        extra = capacity - len(self._pools)
+        self._pools = np.concatenate([self._pools, np.zeros(extra, np.int64)])
+        self._worker_rows = np.concatenate([self._worker_rows, np.zeros(extra, np.int64)])
+        self._statuses = np.concatenate([self._statuses, np.full(extra, -1, np.int8)])
+        for name, column in self._times.items():
+            self._times[name] = np.concatenate([column, np.full(extra, np.nan)])
+
+    def _columns(self, pool_id=None) -> Tuple[Any, Any, Any, Dict[str, Any]]:
+        size = self._size
+        pools, workers, statuses = self._pools[:size], self._worker_rows[:size], self._statuses[:size]
+        times = {name: column[:size] for name, column in self._times.items()}
+        if pool_id is not None:
+            mask = pools == int(pool_id)
+            pools, workers, statuses = pools[mask], workers[mask], statuses[mask]
+            times = {name: column[mask] for name, column in times.items()}
+        return pools, workers, statuses, times
+
+    def _group_stats(self, groups: Any, size: int, workers: Any, statuses: Any, times: Dict[str, Any]) -> dict:
+        """Metrics arrays of rows grouped by group index in range(size)"""
+        known = statuses >= 0
+        status_counts = np.bincount(groups[known] * len(ASSIGMENT_STATUSES) + statuses[known],
+                                    minlength=size * len(ASSIGMENT_STATUSES)).reshape(size, len(ASSIGMENT_STATUSES))
+        submit_millis = (times['submitted'] - times['created']) * 1000
+        has_submit = ~np.isnan(submit_millis)
+        submit_count = np.bincount(groups[has_submit], minlength=size)
+        submit_sum = np.bincount(groups[has_submit], weights=submit_millis[has_submit], minlength=size)
+        submitters = np.unique(groups[has_submit] * len(self.worker_ids) + workers[has_submit])
+        accepted, rejected = status_counts[:, _ACCEPTED], status_counts[:, _REJECTED]
+        return {
+            'assigments_count': np.bincount(groups, minlength=size),
+            'status_counts': status_counts,
+            'acceptance_rate': _rate(accepted, accepted + rejected),
+            'rejection_rate': _rate(rejected, accepted + rejected),
+            UNIQUE_SUBMITTERS_COUNT: np.bincount(submitters // max(len(self.worker_ids), 1), minlength=size),
+            AVG_SUBMIT_ASSIGNMENT_MILLIS: _rate(submit_sum, submit_count),
+        }
+
+    @staticmethod
+    def _to_dicts(keys: Sequence[Any], metrics: dict) -> Dict[Any, dict]:
+        result = {}
+        for i, key in enumerate(keys):
+            result[key] = {
+                'assigments_count': int(metrics['assigments_count'][i]),
+                'status_counts': dict(zip(ASSIGMENT_STATUSES, metrics['status_counts'][i].tolist())),
+                'acceptance_rate': _value(metrics['acceptance_rate'][i]),
+                'rejection_rate': _value(metrics['rejection_rate'][i]),
+                UNIQUE_SUBMITTERS_COUNT: int(metrics[UNIQUE_SUBMITTERS_COUNT][i]),
+                AVG_SUBMIT_ASSIGNMENT_MILLIS: _value(metrics[AVG_SUBMIT_ASSIGNMENT_MILLIS][i]),
+            }
+        return result
+
+    def pool_stats(self) -> Dict[int, dict]:
+        """
+        {pool_id: {'assigments_count', 'status_counts', 'acceptance_rate', 'rejection_rate',
+                   'unique_submitters_count', 'avg_submit_assignment_millis'}}
+        Rates are shares of accepted and rejected among reviewed assigments, None if nothing is reviewed.
+        """
+        pools, workers, statuses, times = self._columns()
+        pool_ids, groups = np.unique(pools, return_inverse=True)
+        metrics = self._group_stats(groups, len(pool_ids), workers, statuses, times)
+        return self._to_dicts(pool_ids.tolist(), metrics)
+
+    def worker_stats(self, pool_id=None) -> Dict[str, dict]:
+        """Same metrics as pool_stats per worker, over all pools or one pool"""
+        _, workers, statuses, times = self._columns(pool_id)
+        worker_rows, groups = np.unique(workers, return_inverse=True)
+        metrics = self._group_stats(groups, len(worker_rows), workers, statuses, times)
+        return self._to_dicts([self.worker_ids[row] for row in worker_rows.tolist()], metrics)
+
+    def throughput(self, window: float = 3600.0, field: str = 'submitted', pool_id=None) -> List[Tuple[float, int]]:
+        """
+        Number of assigments by time windows of their `field` date: [(window start timestamp, count), ...]
+        Windows without assigments are left out.
+        """
+        timestamps = self._columns(pool_id)[3][field]
+        timestamps = timestamps[~np.isnan(timestamps)]
+        windows, counts = np.unique(np.floor(timestamps / window), return_counts=True)
+        return list(zip((windows * window).tolist(), counts.tolist()))
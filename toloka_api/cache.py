@@ -0,0 +1,202 @@
+import sqlite3
+import time
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Set
+from urllib.parse import urlencode
+
+from toloka_api.codec import JsonCodec, default_codec
+from toloka_api.constants import API_V1
+
+DEFAULT_TTLS = {
+    API_V1.PROJECT: 300.0,
+    API_V1.POOLS: 60.0,
+    API_V1.TASKS: 60.0,
+    API_V1.TASK_SUITES: 60.0,
+}
+
+
+def request_key(path: str, params: Any = None) -> str:
+    """Same key for requests with the same path and params in any order"""
+    if not params:
+        return path
+    if isinstance(params, dict):
+        params = sorted(params.items())
+    return f'{path}?{urlencode(params, doseq=True)}'
+
+
+class CacheEntry(NamedTuple):
+    path: str
+    expires_at: float
+    etag: Optional[str]
+    body: bytes
+
+
+class MemoryBackend:
+    """In-memory LRU storage of cache entries"""
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self._entries: 'OrderedDict[str, CacheEntry]' = OrderedDict()
+        self._paths: Dict[str, Set[str]] = {}
+        self._sorted_paths: List[str] = []
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key: str, entry: CacheEntry):
+        self.delete(key)
+        self._entries[key] = entry
+        if entry.path not in self._paths:
+            self._paths[entry.path] = set()
+            insort(self._sorted_paths, entry.path)
+        self._paths[entry.path].add(key)
+        while len(self._entries) > self.max_size:
+            self.delete(next(iter(self._entries)))
+
+    def delete(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            keys = self._paths[entry.path]
+            keys.discard(key)
+            if not keys:
+                del self._paths[entry.path]
+                del self._sorted_paths[bisect_left(self._sorted_paths, entry.path)]
+
+    def delete_paths(self, paths: List[str], prefix: str):
+        """Delete entries of paths and of all paths starting with prefix"""
+        # prefix ends with '/', paths starting with it sort between prefix and prefix with '/' replaced by '0'
+        start = bisect_left(self._sorted_paths, prefix)
+        end = bisect_left(self._sorted_paths, f'{prefix[:-1]}0', start)
+        for path in [*paths, *self._sorted_paths[start:end]]:
+            for key in list(self._paths.get(path, ())):
+                self.delete(key)
+
+    def items(self) -> Iterator:
+        return iter(list(self._entries.items()))
+
+
+class SqliteBackend:
+    """
+    On-disk LRU storage of cache entries, survives process restarts.
+    Hits update LRU order in batches of touch_batch (and before every write), not on every read.
+    """
+
+    def __init__(self, path: str, max_size: int = 100000, touch_batch: int = 256):
+        self.max_size = max_size
+        self.touch_batch = touch_batch
+        self._touched: Dict[str, float] = {}
+        self._db = sqlite3.connect(path)
+        self._db.execute('CREATE TABLE IF NOT EXISTS cache '
+                         '(key TEXT PRIMARY KEY, path TEXT, expires_at REAL, etag TEXT, body BLOB, used_at REAL)')
+        self._db.execute('CREATE INDEX IF NOT EXISTS cache_used_at ON cache (used_at)')
+        self._db.execute('CREATE INDEX IF NOT EXISTS cache_path ON cache (path)')
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        row = self._db.execute('SELECT path, expires_at, etag, body FROM cache WHERE key = ?', (key, )).fetchone()
+        if row is None:
+            return None
+        self._touched[key] = time.time()
+        if len(self._touched) >= self.touch_batch:
+            with self._db:
+                self._flush_touched()
+        return CacheEntry(*row)
+
+    def _flush_touched(self):
+        if self._touched:
+            self._db.executemany('UPDATE cache SET used_at = ? WHERE key = ?',
+                                 [(used_at, key) for key, used_at in self._touched.items()])
+            self._touched.clear()
+
+    def set(self, key: str, entry: CacheEntry):
+        with self._db:
+            self._flush_touched()
+            self._db.execute('INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?, ?, ?)', (key, *entry, time.time()))
+            self._db.execute(
+                'DELETE FROM cache WHERE key IN '
+                '(SELECT key FROM cache ORDER BY used_at DESC LIMIT -1 OFFSET ?)', (self.max_size, ))
+
+    def delete(self, key: str):
+        self._touched.pop(key, None)
+        with self._db:
+            self._db.execute('DELETE FROM cache WHERE key = ?', (key, ))
+
+    def delete_paths(self, paths: List[str], prefix: str):
+        """Delete entries of paths and of all paths starting with prefix"""
+        with self._db:
+            self._flush_touched()
+            self._db.execute(f'DELETE FROM cache WHERE path IN ({",".join("?" * len(paths))})', paths)
+            # prefix ends with '/', paths starting with it sort between prefix and prefix with '/' replaced by '0'
+            self._db.execute('DELETE FROM cache WHERE path >= ? AND path < ?', (prefix, f'{prefix[:-1]}0'))
+
+    def items(self) -> Iterator:
+        for key, *entry in self._db.execute('SELECT key, path, expires_at, etag, body FROM cache').fetchall():
+            yield key, CacheEntry(*entry)
+
+    def close(self):
+        with self._db:
+            self._flush_touched()
+        self._db.close()
+
+
+class ResponseCache:
+    """
+    Cache of GET responses for opt-in endpoints.
+
+    ttls maps api path prefix to seconds responses of its items (prefix/id and deeper) live, paths without ttl
+    are not cached. Collection paths (list pages) are never cached, so exports always see new items.
+    Every put/patch/post made by the client drops cached responses of the same resource,
+    its sub-resources and the collection it belongs to.
+    With revalidate=True expired entry with ETag is checked with If-None-Match instead of being downloaded again.
+
+    Example:
+        client = TolokaClient(oauth_token, cache=ResponseCache(ttls={API_V1.POOLS: 30}))
+        client = TolokaClient(oauth_token, cache=ResponseCache(backend=SqliteBackend('toloka_cache.db')))
+    """
+
+    def __init__(self,
+                 ttls: Dict[str, float] = None,
+                 max_size: int = 1024,
+                 backend: Any = None,
+                 revalidate: bool = False,
+                 codec: JsonCodec = None):
+        self.ttls = DEFAULT_TTLS if ttls is None else ttls
+        self.backend = backend or MemoryBackend(max_size)
+        self.revalidate = revalidate
+        self.codec = codec or default_codec()
+
+    def ttl(self, path: str) -> Optional[float]:
+        prefixes = [prefix for prefix in self.ttls if path.startswith(f'{prefix}/')]
+        return self.ttls[max(prefixes, key=len)] if prefixes else None
+
+    key = staticmethod(request_key)
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        return self.backend.get(key)
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        return entry.expires_at > time.time()
+
+    def decode(self, entry: CacheEntry) -> Any:
+        """Cached response as new object, so callers may change it"""
+        return self.codec.loads(entry.body)
+
+    def set(self, key: str, path: str, result: Any, ttl: float, etag: Optional[str] = None):
+        self.backend.set(key, CacheEntry(path.rstrip('/'), time.time() + ttl, etag, self.codec.dumps(result)))
+
+    def refresh(self, key: str, entry: CacheEntry, ttl: float):
+        self.backend.set(key, entry._replace(expires_at=time.time() + ttl))
+
+    def invalidate(self, path: str):
+        """
+        Drop responses of path, its sub-resources and resources it belongs to
+        """
+        path = path.split('?')[0].rstrip('/')
+        if self.ttl(path) is None and not any(prefix.startswith(f'{path}/') for prefix in self.ttls):
+            return
+        parts = path.split('/')
+        paths = ['/'.join(parts[:end]) for end in range(2, len(parts) + 1)]
+        self.backend.delete_paths(paths, f'{path}/')
@@ -0,0 +1,150 @@
+import asyncio
+import gzip
+import hashlib
+import json
+import time
+from collections import defaultdict, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterable, Iterator, Optional, Tuple, Union
+from urllib.parse import parse_qsl
+
+from multidict import CIMultiDict
+
+from toloka_api.cache import request_key
+from toloka_api.exceptions import CassetteError
+
+RECORDED_HEADERS = ('Content-Type', 'ETag', 'Retry-After')
+IGNORED_PARAMS = ('operation_id', )
+
+Send = Callable[[], Awaitable[Tuple[int, Any, bytes]]]
+
+
+def ignored_values(path: str, params: Any, ignore_params=IGNORED_PARAMS) -> Dict[str, str]:
+    items = parse_qsl(path.partition('?')[2])
+    if params:
+        items.extend(params.items() if isinstance(params, dict) else params)
+    return {str(k): str(v) for k, v in items if k in ignore_params}
+
+
+def interaction_key(path: str, params: Any = None, data: Optional[bytes] = None, ignore_params=IGNORED_PARAMS,
+                    match_body: bool = True) -> str:
+    """
+    Key of request in cassette: path with sorted query params (from path and params) and hash of json body.
+    ignore_params are left out of key, by default random operation_id of async operations.
+    """
+    path, _, query = path.partition('?')
+    items = parse_qsl(query, keep_blank_values=True)
+    if params:
+        items.extend(params.items() if isinstance(params, dict) else params)
+    key = request_key(path, sorted((str(k), str(v)) for k, v in items if k not in ignore_params))
+    if match_body and data:
+        try:
+            data = json.dumps(json.loads(data), sort_keys=True, separators=(',', ':')).encode()
+        except ValueError:
+            pass
+        key = f'{key} {hashlib.sha1(data).hexdigest()}'
+    return key
+
+
+def read_cassette(path: str) -> Iterator[dict]:
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+class RecordTransport:
+    """
+    Sends requests over http and records them with responses to gzipped json lines cassette.
+    Request headers (authorization token) are not recorded, response headers only RECORDED_HEADERS.
+
+    Example:
+        transport = RecordTransport('pool.jsonl.gz')
+        async with TolokaClient(oauth_token, transport=transport) as client:
+            await client.get_all_assigments(pool_id)
+    """
+
+    def __init__(self, path: str, ignore_params: Iterable[str] = IGNORED_PARAMS, match_body: bool = True):
+        self.path = path
+        self.ignore_params = tuple(ignore_params)
+        self.match_body = match_body
+        self._file = None
+        self._started = time.perf_counter()
+
+    async def request(self, method: str, path: str, params: Any, data: Optional[bytes], send: Send):
+        started = time.perf_counter()
+        status, headers, body = await send()
+        self.write({
+            'method': method,
+            'key': interaction_key(path, params, data, self.ignore_params, self.match_body),
+            'ignored': ignored_values(path, params, self.ignore_params),
+            'started': round(started - self._started, 6),
+            'duration': round(time.perf_counter() - started, 6),
+            'status': status,
+            'headers': {name: headers[name] for name in RECORDED_HEADERS if name in headers},
+            'body': body.decode('utf-8', errors='replace'),
+        })
+        return status, headers, body
+
+    def write(self, interaction: dict):
+        if self._file is None:
+            self._file = gzip.open(self.path, 'wt', encoding='utf-8')
+        self._file.write(json.dumps(interaction, ensure_ascii=False))
+        self._file.write('\n')
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class ReplayTransport:
+    """
+    Answers requests with responses recorded by RecordTransport, no requests are sent.
+    Identical requests get recorded responses in recorded order (so retries after 429 get the same
+    429 bursts), after the last one the last response is repeated, e.g. finished operation.
+    speed: None replays at full speed, 1.0 waits for recorded duration of every response, 2.0 half of it.
+    Values of ignore_params generated by this run are mapped to recorded ones, so operation polled
+    by its own operation_id is found in cassette. Unknown request raises CassetteError.
+    """
+
+    def __init__(self,
+                 path: str,
+                 speed: Optional[float] = None,
+                 ignore_params: Iterable[str] = IGNORED_PARAMS,
+                 match_body: bool = True):
+        self.path = path
+        self.speed = speed
+        self.ignore_params = tuple(ignore_params)
+        self.match_body = match_body
+        self._interactions: Dict[Tuple[str, str], Deque[dict]] = defaultdict(deque)
+        self._aliases: Dict[str, str] = {}
+        for interaction in read_cassette(path):
+            self._interactions[interaction['method'], interaction['key']].append(interaction)
+
+    async def request(self, method: str, path: str, params: Any, data: Optional[bytes], send: Send):
+        path = self._replace_aliases(path)
+        key = interaction_key(path, params, data, self.ignore_params, self.match_body)
+        interactions = self._interactions.get((method, key))
+        if not interactions:
+            raise CassetteError(method, key)
+        interaction = interactions.popleft() if len(interactions) > 1 else interactions[0]
+        for name, value in ignored_values(path, params, self.ignore_params).items():
+            recorded = interaction.get('ignored', {}).get(name)
+            if recorded is not None and recorded != value:
+                self._aliases[value] = recorded
+        if self.speed:
+            await asyncio.sleep(interaction['duration'] / self.speed)
+        return interaction['status'], CIMultiDict(interaction['headers']), interaction['body'].encode('utf-8')
+
+    def _replace_aliases(self, path: str) -> str:
+        """Replace ids generated by this run (e.g. operation_id) in path with recorded ones"""
+        if not self._aliases:
+            return path
+        path, mark, query = path.partition('?')
+        return '/'.join(self._aliases.get(segment, segment) for segment in path.split('/')) + mark + query
+
+    def close(self):
+        pass
+
+
+Transport = Union[RecordTransport, ReplayTransport]
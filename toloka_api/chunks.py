@@ -0,0 +1,65 @@
+import asyncio
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Iterable, List, Optional, Union
+
+from toloka_api.codec import default_codec
+
+AnyIterable = Union[Iterable, AsyncIterable]
+
+_codec = default_codec()
+
+
+def json_size(item: Any) -> int:
+    return len(_codec.dumps(item)) + 1
+
+
+async def aiter_any(items: AnyIterable) -> AsyncIterator:
+    """Iterate over sync or async iterable in the same way"""
+    if hasattr(items, '__aiter__'):
+        async for item in items:  # type: ignore
+            yield item
+    else:
+        for item in items:  # type: ignore
+            yield item
+
+
+async def iter_chunks(items: AnyIterable,
+                      max_items: int,
+                      max_bytes: Optional[int] = None,
+                      sizeof: Callable[[Any], int] = json_size) -> AsyncIterator[List]:
+    """
+    Lazily group items into lists of not more than max_items items and max_bytes serialized bytes.
+    Item bigger than max_bytes goes into a chunk of its own.
+    """
+    chunk: List = []
+    chunk_bytes = 0
+    async for item in aiter_any(items):
+        item_bytes = sizeof(item) if max_bytes else 0
+        if chunk and (len(chunk) >= max_items or max_bytes and chunk_bytes + item_bytes > max_bytes):
+            yield chunk
+            chunk, chunk_bytes = [], 0
+        chunk.append(item)
+        chunk_bytes += item_bytes
+    if chunk:
+        yield chunk
+
+
+async def map_unordered(func: Callable[[Any], Awaitable], items: AnyIterable, concurrency: int) -> AsyncIterator:
+    """
+    Run func over items with not more than `concurrency` calls at a time.
+    Items are read lazily, results are yielded in order of completion.
+    """
+    pending: set = set()
+    try:
+        async for item in aiter_any(items):
+            if len(pending) >= concurrency:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+            pending.add(asyncio.ensure_future(func(item)))
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
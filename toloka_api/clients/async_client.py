@@ -1,64 +1,252 @@
 import asyncio
-import time
+import uuid
+from collections import Counter, deque
+from datetime import datetime, timedelta, timezone
 from json import JSONDecodeError
 from logging import Logger
-from toloka_api.constants import API_V1, TOO_MANY_REQUESTS, TIMEOUT, AssigmentStatus
+from operator import itemgetter
+from toloka_api.constants import API_V1, TIMEOUT, AssigmentStatus, BonusResult, RequestPriority, TolokaTaskDateTag
 from aiohttp import ClientSession
-from typing import Any, List, Union
+from typing import (Any, AsyncIterable, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional, Tuple,
+                    Union)
 
 import aiohttp
-from aiohttp import ContentTypeError
+
+from toloka_api.analytics import AssigmentStats
+from toloka_api.cache import ResponseCache, request_key
+from toloka_api.cassette import Transport
+from toloka_api.chunks import iter_chunks, map_unordered
+from toloka_api.coalesce import RequestCoalescer
+from toloka_api.codec import JsonCodec, default_codec
+from toloka_api.decode import ResponseDecoder
+from toloka_api.exceptions import OperationNotFoundError, RequestError, TolokaError
+from toloka_api.export import ASSIGMENT_COLUMNS, TASK_COLUMNS, Columns, export_pages
+from toloka_api.metrics import RequestMetrics, RequestTimings
+from toloka_api.models import AssigmentBatch
+from toloka_api.operations import OperationWatcher
+from toloka_api.pagination import (format_date, iter_cursor_pages, iter_items, iter_numbered_pages,
+                                   iter_partitioned_pages, parse_date)
+from toloka_api.rate_limit import RateLimiter
+from toloka_api.retry import RetryPolicy, is_too_many_requests
+from toloka_api.scheduler import RequestScheduler, request_priority
+from toloka_api.session import ConnectionSettings
+from toloka_api.sync import ID_CURSOR, AssigmentStore
 
 log = Logger('Toloka api')
 
 
-def retry(func):
-    async def wrapper(*args, **kwargs):
-        result = None
-        for i in range(15):
-            try:
-                result = await func(*args, **kwargs)
-                if not result or result.get('code') == TOO_MANY_REQUESTS:
-                    time.sleep(i ^ 2 + 1)
-                    continue
-                break
-            except asyncio.TimeoutError:
-                log.error('timeout')
-        if result is None or result.get('code') == TOO_MANY_REQUESTS:
-            log.error(f'Some malfunctions with Toloka requests. \nresult: \n{result}')
-            exit(1)
+def _overlap_target(overlap: Any) -> Callable[[dict], Optional[int]]:
+    if isinstance(overlap, int):
+        return lambda entity: overlap
+    if isinstance(overlap, dict):
+        mapping = {str(key): value for key, value in overlap.items()}
+        return lambda entity: mapping.get(str(entity['id']))
+    return overlap
 
-        return result
 
-    return wrapper
+def _aggregation_params(pool_id: int, skill_id: int, field_names: list) -> dict:
+    return {
+        'pool_id': pool_id,
+        'type': 'WEIGHTED_DYNAMIC_OVERLAP',
+        'answer_weight_skill_id': skill_id,
+        'fields': [{
+            'name': n
+        } for n in field_names]
+    }
 
 
 class AsyncRest:
-    def __init__(self, host: str, session: ClientSession, headers: dict = None, proxies: dict = None):
+    def __init__(self,
+                 host: str,
+                 session: ClientSession = None,
+                 headers: dict = None,
+                 proxies: dict = None,
+                 retry_policy: RetryPolicy = None,
+                 rate_limiter: RateLimiter = None,
+                 connection_settings: ConnectionSettings = None,
+                 codec: JsonCodec = None,
+                 cache: ResponseCache = None,
+                 coalescer: RequestCoalescer = None,
+                 metrics: RequestMetrics = None,
+                 transport: Transport = None,
+                 priority_weights: Dict[str, float] = None,
+                 decoder: ResponseDecoder = None):
+        """
+        session: shared session, it's not closed by close(). If not set, own session is created
+            on first request with connection_settings.
+        codec: json codec for request and response bodies, orjson one if it's installed.
+        cache: cache for GET responses, disabled by default.
+        coalescer: joins concurrent identical GET requests, RequestCoalescer(enabled=False) turns it off.
+        metrics: collects per endpoint request metrics, disabled by default.
+        transport: RecordTransport or ReplayTransport to record requests to cassette or replay them without network.
+        priority_weights: {priority: weight} of RequestScheduler sharing rate_limiter between priority classes.
+        decoder: decodes big response bodies in worker processes instead of codec, disabled by default.
+        """
         self.host = host
         self.headers = headers
         self.proxies = proxies
-        self.session = session
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.scheduler = RequestScheduler(self.rate_limiter, priority_weights)
+        self.connection_settings = connection_settings or ConnectionSettings()
+        self.codec = codec or default_codec()
+        self.cache = cache
+        self.coalescer = coalescer or RequestCoalescer()
+        self.metrics = metrics
+        self.transport = transport
+        self.decoder = decoder
+        self._session = session
+        self._owns_session = session is None
+
+    @property
+    def session(self) -> ClientSession:
+        if self._session is None or (self._owns_session and self._session.closed):
+            trace_configs = [self.metrics.trace_config()] if self.metrics is not None else None
+            self._session = self.connection_settings.create_session(trace_configs)
+        return self._session
+
+    async def close(self):
+        if self.transport is not None:
+            self.transport.close()
+        if self.decoder is not None:
+            self.decoder.close()
+        if self._owns_session and self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
 
-    @retry
     async def _send_request(self, method: str, path: str, **kwargs) -> Any:
+        """
+        Send request and return decoded response.
+        Concurrent identical GET requests are coalesced into one.
+        GET responses are taken from cache when it's set, other methods invalidate cached resource.
+        priority: RequestPriority of the request, see RequestScheduler
+        """
+        kwargs['priority'] = self.scheduler.priority(method, path, kwargs.get('priority'), kwargs.get('params'))
+        if method == 'GET':
+            key = request_key(path, kwargs.get('params'))
+            return await self.coalescer.run(key, lambda: self._get(path, **kwargs))
+        _, result = await self._send_change(method, path, **kwargs)
+        return result
+
+    async def _send_change(self, method: str, path: str, **kwargs) -> Tuple[Optional[int], Any]:
+        """Send not GET request invalidating cached resource, return status and decoded response"""
+        try:
+            status, _, result = await self._send(method, path, **kwargs)
+        finally:
+            if self.cache is not None:
+                self.cache.invalidate(path)
+        return status, result
+
+    async def _get(self, path: str, params=None, **kwargs) -> Any:
+        cache = self.cache
+        ttl = cache.ttl(path) if cache is not None else None
+        if cache is None or ttl is None:
+            _, _, result = await self._send('GET', path, params=params, **kwargs)
+            return result
+        key = cache.key(path, params)
+        entry = cache.get(key)
+        if entry is not None and cache.is_fresh(entry):
+            return cache.decode(entry)
+        if entry is not None and entry.etag and cache.revalidate:
+            kwargs['headers'] = {**(kwargs.get('headers', self.headers) or {}), 'If-None-Match': entry.etag}
+
+        status, headers, result = await self._send('GET', path, params=params, **kwargs)
+        if status == 304 and entry is not None:
+            cache.refresh(key, entry, ttl)
+            return cache.decode(entry)
+        if status == 200:
+            cache.set(key, path, result, ttl, headers.get('ETag'))
+        return result
+
+    async def _send(self, method: str, path: str, **kwargs) -> Tuple[Optional[int], Any, Any]:
+        """
+        Send request, retrying it according to retry_policy. Return status, headers and decoded body.
+        Backoff is awaited, so other requests keep going while this one waits.
+        """
         url = f'{self.host}{path}'
-        log.debug(f'{method} {url}')
-        log.info(f'_send_request({method}, {url})')
-        timeout = aiohttp.ClientTimeout(total=TIMEOUT)  # type: ignore
+        log.info('_send_request(%s, %s)', method, url)
+        priority = kwargs.pop('priority', RequestPriority.NORMAL)
+        json_body = kwargs.pop('json', None)
+        if json_body is not None:
+            kwargs['data'] = self.codec.dumps(json_body)
+            headers = kwargs.get('headers', self.headers) or {}
+            if 'Content-Type' not in headers:
+                kwargs['headers'] = {**headers, 'Content-Type': 'application/json'}
+        attempt = 0
+        while True:
+            attempt += 1
+            status, headers, result, error = None, {}, None, None
+            try:
+                async with self.scheduler.slot(priority):
+                    status, headers, result = await self._request(method, url, **kwargs)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                log.error('Request error %s, %s', method, url, exc_info=True)
+                error = e
+                if self.metrics is not None:
+                    self.metrics.record_error(method, path)
+            else:
+                if is_too_many_requests(status, result):
+                    self.rate_limiter.on_throttled()
+                else:
+                    self.rate_limiter.on_success()
+
+            if not self.retry_policy.is_retryable(method, status, result, error):
+                if error is not None:
+                    raise RequestError(method, url, attempt) from error
+                return status, headers, result
+            if attempt >= self.retry_policy.max_attempts:
+                log.error(f'Some malfunctions with Toloka requests. \nresult: \n{result}')
+                raise RequestError(method, url, attempt, status, result) from error
+            if self.metrics is not None:
+                self.metrics.record_retry(method, path, is_too_many_requests(status, result))
+            await asyncio.sleep(self.retry_policy.get_delay(attempt, headers.get('Retry-After')))
+
+    async def _request(self, method: str, url: str, **kwargs) -> Tuple[int, Any, Any]:
+        """
+        Make single http request (or pass it to transport).
+        Return status, headers and body decoded by codec (None if body is not json).
+        """
+        log.debug('%s %s', method, url)
+        timings = None
+        if self.metrics is not None:
+            timings = kwargs['trace_request_ctx'] = self.metrics.start(method, url[len(self.host):])
+        if self.transport is None:
+            status, headers, body = await self._http_request(method, url, timings, **kwargs)
+        else:
+            status, headers, body = await self.transport.request(
+                method, url[len(self.host):], kwargs.get('params'), kwargs.get('data'),
+                lambda: self._http_request(method, url, timings, **kwargs))
         try:
-            async with self.session.request(method=method,
-                                            url=url,
-                                            headers=kwargs.pop('headers', self.headers),
-                                            timeout=kwargs.pop('timeout', timeout),
-                                            **kwargs) as response:
-                try:
-                    res = await response.json()
-                    return res
-                except (ContentTypeError, Exception):
-                    log.error(f'Response error {method}, {url}, {await response.text()}', exc_info=True)
-        except Exception:
-            log.error(f'Request error', exc_info=True)
+            if self.decoder is not None and body:
+                res = await self.decoder.decode(url[len(self.host):], body)
+            else:
+                res = self.codec.loads(body) if body else None
+        except ValueError:
+            log.error(f'Response error {method}, {url}, {body[:1000]!r}', exc_info=True)
+            res = None
+        if timings is not None:
+            data = kwargs.get('data')
+            request_bytes = len(data) if isinstance(data, bytes) else 0
+            self.metrics.finish(timings, status, request_bytes, len(body), res)  # type: ignore
+        return status, headers, res
+
+    async def _http_request(self, method: str, url: str, timings: Optional[RequestTimings],
+                            **kwargs) -> Tuple[int, Any, bytes]:
+        timeout = aiohttp.ClientTimeout(total=TIMEOUT)  # type: ignore
+        async with self.session.request(method=method,
+                                        url=url,
+                                        headers=kwargs.pop('headers', self.headers),
+                                        timeout=kwargs.pop('timeout', timeout),
+                                        **kwargs) as response:
+            if timings is not None:
+                timings.headers_received()
+            body = await response.read()
+        return response.status, response.headers, body
 
     async def post(self, path: str, json=None, **kwargs) -> Any:
         resp = await self._send_request('POST', path, json=json, **kwargs)
@@ -68,6 +256,13 @@ class AsyncRest:
         resp = await self._send_request('GET', path, params=params, **kwargs)
         return resp
 
+    async def post_with_status(self, path: str, json=None, **kwargs) -> Tuple[Optional[int], Any]:
+        """
+        POST returning response status with decoded response, e.g. to tell 409 conflict from other errors
+        """
+        kwargs['priority'] = self.scheduler.priority('POST', path, kwargs.get('priority'), kwargs.get('params'))
+        return await self._send_change('POST', path, json=json, **kwargs)
+
     async def patch(self, path: str, json=None, **kwargs) -> Any:
         resp = await self._send_request('PATCH', path, json=json, **kwargs)
         return resp
@@ -76,23 +271,82 @@ class AsyncRest:
         resp = await self._send_request('PUT', path, json=json, **kwargs)
         return resp
 
-    def __del__(self):
-        if not self.session.closed:
-            if self.session._connector_owner:
-                self.session._connector.close()
-            self.session._connector = None
-
 
 class TolokaClient(object):
-    def __init__(self, oauth_token: str, sandbox: bool = False):
-        session = ClientSession()
-        if sandbox:
-            self.api = AsyncRest(f'https://sandbox.toloka.yandex.ru', session)
-        else:
-            self.api = AsyncRest(f'https://toloka.yandex.ru', session)
+    def __init__(self,
+                 oauth_token: str,
+                 sandbox: bool = False,
+                 retry_policy: RetryPolicy = None,
+                 rate_limiter: RateLimiter = None,
+                 session: ClientSession = None,
+                 connection_settings: ConnectionSettings = None,
+                 codec: JsonCodec = None,
+                 cache: ResponseCache = None,
+                 coalescer: RequestCoalescer = None,
+                 metrics: RequestMetrics = None,
+                 host: str = None,
+                 transport: Transport = None,
+                 priority_weights: Dict[str, float] = None,
+                 decoder: ResponseDecoder = None):
+        """
+        rate_limiter: shared by all requests of this client, pass the same instance
+            to several clients to make them share one rate budget.
+        session: session shared with other clients, client doesn't close it.
+            By default client creates its own session with connection_settings on first request.
+        codec: json codec for request and response bodies, orjson one if it's installed.
+        cache: cache for pools, projects and tasks metadata, disabled by default.
+            Changes made through this client invalidate cached resources.
+        coalescer: joins concurrent identical GET requests (same path and params) into one,
+            RequestCoalescer(window=0.01) also joins requests made within 10ms.
+        metrics: RequestMetrics collecting latency, status, retry and size metrics per endpoint.
+        host: api host instead of toloka one chosen by sandbox, e.g. local mock server.
+        transport: RecordTransport records requests and responses to cassette file,
+            ReplayTransport answers requests from cassette without network and api quota.
+        priority_weights: {priority: weight} shares of rate and connections of request priority classes.
+            Accept/reject, pool open/close and balance are INTERACTIVE, list pages and bulk uploads are BULK,
+            the rest is NORMAL. Override with `with client.priority(RequestPriority.BULK): ...`
+        decoder: ResponseDecoder parsing large pages in worker processes, optionally keeping only some fields.
+
+        Use client as async context manager or call close() to release connections:
+            async with TolokaClient(oauth_token) as client:
+                tasks = await client.get_all_tasks(pool_id)
+        """
+        if host is None:
+            host = 'https://sandbox.toloka.yandex.ru' if sandbox else 'https://toloka.yandex.ru'
+        self.api = AsyncRest(host,
+                             session,
+                             retry_policy=retry_policy,
+                             rate_limiter=rate_limiter,
+                             connection_settings=connection_settings,
+                             codec=codec,
+                             cache=cache,
+                             coalescer=coalescer,
+                             metrics=metrics,
+                             transport=transport,
+                             priority_weights=priority_weights,
+                             decoder=decoder)
+        self.operations = OperationWatcher(self.get_operation_info)
         self.headers = {'Authorization': f'OAuth {oauth_token}'}
         self.headers.update({'Content-Type': 'application/json'})
 
+    async def close(self):
+        await self.api.close()
+
+    @staticmethod
+    def priority(priority: str) -> Iterator[None]:
+        """
+        Context manager sending all requests inside it with given RequestPriority:
+            with client.priority(RequestPriority.INTERACTIVE):
+                await client.get_pool(pool_id)
+        """
+        return request_priority(priority)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
     async def get_projects(self, params=None) -> Any:
         res = await self.api.get(
             path=API_V1.ASSIGMENTS,
@@ -117,30 +371,25 @@ class TolokaClient(object):
         )
         return res['totalElements']
 
-    async def get_workers(self, params=None) -> Any:
-        if params is None:
-            params = {}
-        workers = []
-        params['size'] = 100
-        first_page_json_ = await self.api.get(
+    async def get_workers_page(self, params) -> Any:
+        res = await self.api.get(
             path=API_V1.WORKERS,
             headers=self.headers,
             params=params,
         )
-        first_page_json = first_page_json_
-        workers += first_page_json['content']
+        return res
 
-        for page_index in range(1, first_page_json['totalPages']):
-            params['page'] = page_index
-            page_json_ = await self.api.get(
-                path=API_V1.WORKERS,
-                headers=self.headers,
-                params=params,
-            )
-            page_json = page_json_
-            workers += page_json['content']
+    def iter_workers(self, params=None, concurrency: int = 8, pages: bool = False) -> AsyncIterator:
+        """
+        Iterate over all workers in order.
+        Pages after the first one are fetched concurrently, up to `concurrency` at a time.
+        pages: yield lists of workers instead of single workers
+        """
+        workers = iter_numbered_pages(self.get_workers_page, {**(params or {}), 'size': 100}, concurrency)
+        return workers if pages else iter_items(workers)
 
-        return workers
+    async def get_workers(self, params=None, concurrency: int = 8) -> Any:
+        return [worker async for worker in self.iter_workers(params, concurrency)]
 
     async def get_pools_list(self, params) -> Any:
         """
@@ -164,20 +413,22 @@ class TolokaClient(object):
         )
         return res
 
+    def iter_pools(self, limit=300, pages: bool = False, **kwargs) -> AsyncIterator:
+        """
+        Iterate over all pools, next page is prefetched while current one is processed.
+        pages: yield lists of pools instead of single pools
+        Example: async for pool in iter_pools(project_id=project_id, created_gte=date)
+        """
+        pool_params = {'sort': 'id', 'limit': limit, **kwargs}
+        pools = iter_cursor_pages(self.get_pools_list, pool_params)
+        return pools if pages else iter_items(pools)
+
     async def get_all_pools(self, limit=300, **kwargs) -> Any:
         """
         Get all pools 
         Example: get_all_pools(project_id=project_id, created_gte=date)
         """
-        pools = []
-        pool_params = {'sort': 'id', 'limit': limit, **kwargs}
-        pools_ = await self.get_pools_list(pool_params)
-        pools.extend(pools_['items'])
-        while pools_['has_more']:
-            pool_params = {**pool_params, 'id_gt': pools_['items'][-1]['id']}
-            pools_ = await self.get_pools_list(pool_params)
-            pools.extend(pools_['items'])
-        return pools
+        return [pool async for pool in self.iter_pools(limit, **kwargs)]
 
     async def get_pool(self, pool_id: int) -> Any:
         """
@@ -200,7 +451,9 @@ class TolokaClient(object):
         """
         Open/ close pool
         """
-        res = await self.api.post(path=f'{API_V1.POOLS}/{pool_id}/{operation_type}', headers=self.headers)
+        res = await self.api.post(path=f'{API_V1.POOLS}/{pool_id}/{operation_type}',
+                                  headers=self.headers,
+                                  priority=RequestPriority.INTERACTIVE)
         return res
 
     async def start_pool(self, pool_id: int) -> dict:
@@ -243,19 +496,55 @@ class TolokaClient(object):
         )
         return res
 
-    async def get_all_tasks(self, pool_id: int, limit=1000, **kwargs) -> Any:
+    def iter_tasks(self, pool_id: int, limit=1000, pages: bool = False, **kwargs) -> AsyncIterator:
         """
-        Return all tasks from pool
+        Iterate over all tasks from pool, next page is prefetched while current one is processed.
+        pages: yield lists of tasks instead of single tasks
+        """
+        task_params = {'pool_id': pool_id, 'sort': 'id', 'limit': limit, **kwargs}
+        tasks = iter_cursor_pages(self.get_task_list, task_params)
+        return tasks if pages else iter_items(tasks)
+
+    def iter_tasks_partitioned(self,
+                               pool_id: int,
+                               shards: int = 8,
+                               created_gte: datetime = None,
+                               created_lt: datetime = None,
+                               limit=1000,
+                               pages: bool = False,
+                               **kwargs) -> AsyncIterator:
+        """
+        Iterate over tasks from pool walking `shards` creation time windows concurrently.
+        Dense windows are split on the fly. Tasks come in no particular order.
         """
-        tasks = []
         task_params = {'pool_id': pool_id, 'sort': 'id', 'limit': limit, **kwargs}
-        task_suites = await self.get_task_list(task_params)
-        tasks.extend(task_suites['items'])
-        while task_suites['has_more']:
-            task_params = {**task_params, 'id_gt': task_suites['items'][-1]['id']}
-            task_suites = await self.get_task_list(task_params)
-            tasks.extend(task_suites['items'])
-        return tasks
+        tasks = iter_partitioned_pages(self.get_task_list, task_params, created_gte, created_lt, shards)
+        return tasks if pages else iter_items(tasks)
+
+    async def get_all_tasks(self, pool_id: int, limit=1000, shards: int = None, **kwargs) -> Any:
+        """
+        Return all tasks from pool
+        shards: fetch tasks with iter_tasks_partitioned, walking this many windows concurrently
+        """
+        if shards:
+            tasks = [task async for task in self.iter_tasks_partitioned(pool_id, shards, limit=limit, **kwargs)]
+            return sorted(tasks, key=itemgetter('id'))
+        return [task async for task in self.iter_tasks(pool_id, limit, **kwargs)]
+
+    async def export_tasks(self,
+                           pool_id: int,
+                           path: str,
+                           format: str = 'parquet',
+                           columns: Columns = None,
+                           row_group_size: int = 100000,
+                           **kwargs) -> int:
+        """
+        Stream all tasks from pool into parquet or arrow ipc file, row group by row group. Needs pyarrow.
+        Return number of written tasks.
+        columns: {column name: (dotted path in task, type)}, TASK_COLUMNS by default
+        """
+        pages = self.iter_tasks(pool_id, pages=True, **kwargs)
+        return await export_pages(pages, path, columns or TASK_COLUMNS, format, row_group_size)
 
     async def create_task(self, json, params=None, **kwargs) -> Any:
         res = await self.api.post(**kwargs, path=f'{API_V1.TASKS}', headers=self.headers, json=json, params=params)
@@ -264,11 +553,12 @@ class TolokaClient(object):
         except JSONDecodeError:
             log.error('Fail while creating task', exc_info=True)
 
-    async def patch_task_overlap(self, task, overlap) -> Any:
+    async def patch_task_overlap(self, task, overlap, **kwargs) -> Any:
         """
         Change task overlap
         """
         res = await self.api.patch(
+            **kwargs,
             path=f'{API_V1.TASKS}/{task}',
             headers=self.headers,
             json={'overlap': overlap},
@@ -291,26 +581,116 @@ class TolokaClient(object):
         )
         return res
 
+    def iter_task_suites(self, pool_id, limit=100, pages: bool = False, **kwargs) -> AsyncIterator:
+        """
+        Iterate over all task suites from pool, next page is prefetched while current one is processed.
+        pages: yield lists of task suites instead of single suites
+        """
+        task_params = {'pool_id': pool_id, 'sort': 'id', 'limit': limit, **kwargs}
+        suites = iter_cursor_pages(self.get_task_suites_list, task_params)
+        return suites if pages else iter_items(suites)
+
     async def get_all_task_suites(self, pool_id) -> Any:
-        suites = []
-        limit = 100
-        task_params = {'pool_id': pool_id, 'sort': 'id', 'limit': limit}
-        task_suites = await self.get_task_suites_list(task_params)
-        suites.extend(task_suites['items'])
-        while task_suites['has_more']:
-            task_params = {'pool_id': pool_id, 'sort': 'id', 'limit': limit, 'id_gt': task_suites['items'][-1]['id']}
-            task_suites = await self.get_task_suites_list(task_params)
-            suites.extend(task_suites['items'])
-        return suites
-
-    async def patch_task_suites_overlap(self, suit, overlap) -> Any:
+        return [suite async for suite in self.iter_task_suites(pool_id)]
+
+    async def patch_task_suites_overlap(self, suit, overlap, **kwargs) -> Any:
         res = await self.api.patch(
+            **kwargs,
             path=f'{API_V1.TASK_SUITES}/{suit}',
             headers=self.headers,
             json={'overlap': overlap},
         )
         return res
 
+    async def iter_set_overlaps(self,
+                                pool_id,
+                                overlap: Union[int, Dict[Any, int], Callable[[dict], Optional[int]]],
+                                suites: bool = False,
+                                concurrency: int = 16,
+                                id_gt: str = None) -> AsyncIterator[dict]:
+        """
+        Change overlap of pool tasks (task suites with suites=True), yield outcome of every one as it's done.
+        overlap: new overlap for all, {id: overlap} or function of task json returning overlap (None - leave as is)
+        Tasks are streamed page by page, ones already at target overlap are skipped without requests.
+        Toloka has no batch endpoint for overlap, so every change is a separate PATCH, up to concurrency at a time.
+        Outcome:
+            {'id': ..., 'overlap': <old>, 'target': <new>, 'success': True, 'skipped': False,
+             'result': <response>, 'error': None, 'cursor': <id>}
+        cursor is the id up to which all tasks are done, pass it as id_gt to resume after interruption.
+        """
+        target = _overlap_target(overlap)
+        params = {'id_gt': id_gt} if id_gt is not None else {}
+        entities = self.iter_task_suites(pool_id, **params) if suites else self.iter_tasks(pool_id, **params)
+        order: deque = deque()
+        done: set = set()
+        cursor = id_gt
+
+        async def candidates():
+            async for entity in entities:
+                order.append(str(entity['id']))
+                yield entity, target(entity)
+
+        async def set_overlap(candidate: tuple) -> dict:
+            entity, new_overlap = candidate
+            outcome = {
+                'id': entity['id'],
+                'overlap': entity.get('overlap'),
+                'target': new_overlap,
+                'success': True,
+                'skipped': new_overlap is None or new_overlap == entity.get('overlap'),
+                'result': None,
+                'error': None,
+            }
+            if outcome['skipped']:
+                return outcome
+            patch = self.patch_task_suites_overlap if suites else self.patch_task_overlap
+            try:
+                res = await patch(entity['id'], new_overlap, priority=RequestPriority.BULK)
+            except RequestError as e:
+                outcome.update(success=False, result=e.result, error=e)
+                return outcome
+            outcome['result'] = res
+            outcome['success'] = isinstance(res, dict) and res.get('overlap') == new_overlap
+            return outcome
+
+        async for outcome in map_unordered(set_overlap, candidates(), concurrency):
+            done.add(str(outcome['id']))
+            while order and order[0] in done:
+                cursor = order.popleft()
+                done.discard(cursor)
+            outcome['cursor'] = cursor
+            yield outcome
+
+    async def set_overlaps(self,
+                           pool_id,
+                           overlap: Union[int, Dict[Any, int], Callable[[dict], Optional[int]]],
+                           suites: bool = False,
+                           concurrency: int = 16,
+                           id_gt: str = None) -> dict:
+        """
+        Change overlap of pool tasks or task suites, see iter_set_overlaps.
+        Return report:
+            {'total_count': 3, 'changed_count': 1, 'skipped_count': 1, 'failed_count': 1, 'cursor': <id>,
+             'items': [<outcome>, ...]}
+        Example:
+            await set_overlaps(pool_id, lambda task: 5 if task['input_values']['hard'] else None)
+        """
+        items = []
+        cursor = id_gt
+        async for outcome in self.iter_set_overlaps(pool_id, overlap, suites, concurrency, id_gt):
+            items.append(outcome)
+            cursor = outcome['cursor']
+        skipped = sum(item['skipped'] for item in items)
+        failed = sum(not item['success'] for item in items)
+        return {
+            'total_count': len(items),
+            'changed_count': len(items) - skipped - failed,
+            'skipped_count': skipped,
+            'failed_count': failed,
+            'cursor': cursor,
+            'items': items,
+        }
+
     async def get_assigments(self, params, **kwargs) -> dict:
         res = await self.api.get(
             **kwargs,
@@ -320,22 +700,138 @@ class TolokaClient(object):
         )
         return res
 
-    async def get_all_assigments(self, pool_id, limit=1000, params={}, **kwargs) -> list:
+    def iter_assigments(self, pool_id, limit=1000, params={}, pages: bool = False, **kwargs) -> AsyncIterator:
+        """
+        Iterate over all asigments, next page is prefetched while current one is processed.
+        :params: additional params
+        :pages: yield lists of asigments instead of single asigments
+        """
+        task_params = {'sort': 'id', 'limit': limit, 'pool_id': pool_id, **params}
+        assigments = iter_cursor_pages(lambda p: self.get_assigments(p, **kwargs), task_params)
+        return assigments if pages else iter_items(assigments)
+
+    def iter_assigments_partitioned(self,
+                                    pool_id,
+                                    shards: int = 8,
+                                    created_gte: datetime = None,
+                                    created_lt: datetime = None,
+                                    limit=1000,
+                                    params={},
+                                    pages: bool = False,
+                                    **kwargs) -> AsyncIterator:
+        """
+        Iterate over asigments walking `shards` creation time windows concurrently.
+        Dense windows are split on the fly. Asigments come in no particular order.
+        :params: additional params
+        """
+        task_params = {'sort': 'id', 'limit': limit, 'pool_id': pool_id, **params}
+        assigments = iter_partitioned_pages(lambda p: self.get_assigments(p, **kwargs), task_params, created_gte,
+                                            created_lt, shards)
+        return assigments if pages else iter_items(assigments)
+
+    async def get_all_assigments(self, pool_id, limit=1000, params={}, shards: int = None, **kwargs) -> list:
         """
         Return all asigments.
         :params: additional params
+        :shards: fetch asigments with iter_assigments_partitioned, walking this many windows concurrently
+        """
+        if shards:
+            assigments = self.iter_assigments_partitioned(pool_id, shards, limit=limit, params=params, **kwargs)
+            return sorted([assigment async for assigment in assigments], key=itemgetter('id'))
+        return [assigment async for assigment in self.iter_assigments(pool_id, limit, params, **kwargs)]
+
+    async def get_assigments_batch(self, pool_id, limit=1000, params={}, **kwargs) -> AssigmentBatch:
+        """
+        Return all asigments packed into columnar AssigmentBatch, page by page.
+        Takes several times less memory than get_all_assigments.
+        :params: additional params
+        """
+        batch = AssigmentBatch()
+        async for page in self.iter_assigments(pool_id, limit, params, pages=True, **kwargs):
+            batch.extend(page)
+        return batch
+
+    async def get_assigments_stats(self, pool_id, stats: AssigmentStats = None, params={}, **kwargs) -> AssigmentStats:
+        """
+        Add all pool asigments to stats (new AssigmentStats if not set) page by page. Needs numpy.
+        Pass the same stats with params={'submitted_gte': ...} to update it with new asigments.
+        """
+        stats = stats if stats is not None else AssigmentStats()
+        async for page in self.iter_assigments(pool_id, params=params, pages=True, **kwargs):
+            stats.update(page)
+        return stats
+
+    async def export_assigments(self,
+                                pool_id,
+                                path: str,
+                                format: str = 'parquet',
+                                columns: Columns = None,
+                                row_group_size: int = 100000,
+                                params={},
+                                **kwargs) -> int:
+        """
+        Stream all asigments into parquet or arrow ipc file, row group by row group. Needs pyarrow.
+        Return number of written asigments.
+        :columns: {column name: (dotted path in asigment, type)}, ASSIGMENT_COLUMNS by default
+            Example: {'id': ('id', 'string'), 'result': ('solutions.0.output_values.result', 'string')}
+        :params: additional params
+        """
+        pages = self.iter_assigments(pool_id, params=params, pages=True, **kwargs)
+        return await export_pages(pages, path, columns or ASSIGMENT_COLUMNS, format, row_group_size)
+
+    async def sync_assigments(self,
+                              pool_id,
+                              store: AssigmentStore,
+                              tags: Tuple[str, ...] = (TolokaTaskDateTag.SUBMITTED, TolokaTaskDateTag.ACCEPTED,
+                                                       TolokaTaskDateTag.REJECTED, TolokaTaskDateTag.EXPIRED,
+                                                       TolokaTaskDateTag.SKIPPED),
+                              lookback: timedelta = timedelta(minutes=1),
+                              limit=1000,
+                              params={},
+                              **kwargs) -> List[dict]:
+        """
+        Fetch only asigments which are new or changed since previous sync of the pool,
+        save them to store and return them.
+        New asigments are found by id cursor, status changes by `{tag}_gte` filters starting from
+        the latest seen date of every tag (or previous sync start) minus lookback.
+        Status changes without tracked date tag are not found, so leave expired/skipped in tags
+        to not keep ACTIVE asigments stale.
+        Asigments seen twice are dropped. Changes and checkpoint are saved together when all requests succeeded,
+        a failed sync saves nothing and the next one finds the same changes.
+        First sync of a pool downloads all its asigments.
+        :params: additional params
         """
-        results = []
+        started = datetime.now(timezone.utc)
+        checkpoint = store.checkpoint(pool_id)
+        new_checkpoint = dict(checkpoint)
+        changed: Dict[str, dict] = {}
         task_params = {'sort': 'id', 'limit': limit, 'pool_id': pool_id, **params}
-        task_results = await self.get_assigments(task_params, **kwargs)
-        results.extend(task_results.get('items'))  # type: ignore
-        log.debug(len(results))
-        while task_results['has_more']:
-            task_params = {**task_params, 'id_gt': task_results['items'][-1]['id']}
-            task_results = await self.get_assigments(task_params, **kwargs)
-            results.extend(task_results['items'])
-            log.debug(len(results))
-        return results
+
+        def stage(page: List[dict]):
+            for tag in tags:
+                dates = [item[tag] for item in page if item.get(tag)]
+                if dates:
+                    new_checkpoint[tag] = max(new_checkpoint.get(tag, ''), *dates)
+            for item in page:
+                changed.pop(str(item['id']), None)
+            changed.update((str(item['id']), item) for item in store.changed(page))
+
+        new_params = {**task_params, 'id_gt': checkpoint[ID_CURSOR]} if ID_CURSOR in checkpoint else task_params
+        async for page in self.iter_assigments(pool_id, params=new_params, pages=True, **kwargs):
+            if page:
+                new_checkpoint[ID_CURSOR] = page[-1]['id']
+            stage(page)
+        for tag in tags:
+            if tag in checkpoint:
+                since = format_date(parse_date(checkpoint[tag]) - lookback)
+                async for page in self.iter_assigments(pool_id, params={**task_params, f'{tag}_gte': since},
+                                                       pages=True, **kwargs):
+                    stage(page)
+
+        for tag in tags:
+            new_checkpoint.setdefault(tag, format_date(started))
+        store.commit(pool_id, list(changed.values()), new_checkpoint)
+        return list(changed.values())
 
     async def get_assigment_info(self, task_id) -> Any:
         res = await self.api.get(
@@ -344,13 +840,17 @@ class TolokaClient(object):
         )
         return res
 
-    async def _proceed_assigment(self, res_id, params) -> Any:
+    async def _proceed_assigment(self, res_id, params, priority: str = RequestPriority.INTERACTIVE) -> Any:
         """
         Accept or reject assigment
         Example:
             params =  {'status': '<статус ответа>', 'public_comment': '<комментарий>'}
         """
-        res = await self.api.patch(path=f'{API_V1.ASSIGMENTS}/{res_id}', headers=self.headers, json=params, timeout=10)
+        res = await self.api.patch(path=f'{API_V1.ASSIGMENTS}/{res_id}',
+                                   headers=self.headers,
+                                   json=params,
+                                   timeout=10,
+                                   priority=priority)
         return res
 
     async def accept_assigment(self, res_id: str, public_comment: str) -> Any:
@@ -361,7 +861,7 @@ class TolokaClient(object):
         if public_comment:
             params.update({'public_comment': public_comment})
 
-        res = await self.api.patch(path=f'{API_V1.ASSIGMENTS}/{res_id}', headers=self.headers, json=params, timeout=10)
+        res = await self._proceed_assigment(res_id, params)
         return res
 
     async def reject_assigment(self, res_id: str, public_comment: str = 'Bad.') -> Any:
@@ -370,9 +870,43 @@ class TolokaClient(object):
         """
         params = {'status': AssigmentStatus.REJECTED, 'public_comment': public_comment}
 
-        res = await self.api.patch(path=f'{API_V1.ASSIGMENTS}/{res_id}', headers=self.headers, json=params, timeout=10)
+        res = await self._proceed_assigment(res_id, params)
         return res
 
+    def iter_review_assigments(self,
+                               decisions: Union[Iterable[tuple], AsyncIterable[tuple]],
+                               concurrency: int = 16) -> AsyncIterator[dict]:
+        """
+        Accept or reject many assigments concurrently, yield result of every decision as it's done.
+        decisions: (async) iterable of (assigment_id, status, public_comment) tuples, read lazily
+        Requests share client rate limit. Failed decision doesn't stop the rest, it's reported as
+            {'id': assigment_id, 'status': status, 'success': False, 'result': <response>, 'error': <exception>}
+        Toloka has no batch endpoint for assigments review, so every decision is a separate PATCH.
+        """
+        return map_unordered(self._review_assigment, decisions, concurrency)
+
+    async def review_assigments(self,
+                                decisions: Union[Iterable[tuple], AsyncIterable[tuple]],
+                                concurrency: int = 16) -> List[dict]:
+        """
+        Accept or reject many assigments concurrently. See iter_review_assigments.
+        Example:
+            await review_assigments([(id_1, AssigmentStatus.ACCEPTED, ''), (id_2, AssigmentStatus.REJECTED, 'Bad.')])
+        """
+        return [result async for result in self.iter_review_assigments(decisions, concurrency)]
+
+    async def _review_assigment(self, decision: tuple) -> dict:
+        res_id, status, public_comment = decision
+        params = {'status': status}
+        if public_comment or status == AssigmentStatus.REJECTED:
+            params['public_comment'] = public_comment or 'Bad.'
+        try:
+            res = await self._proceed_assigment(res_id, params, RequestPriority.BULK)
+        except RequestError as e:
+            return {'id': res_id, 'status': status, 'success': False, 'result': e.result, 'error': e}
+        success = isinstance(res, dict) and res.get('status') == status
+        return {'id': res_id, 'status': status, 'success': success, 'result': res, 'error': None}
+
     async def send_message(self, params) -> Any:
         res = await self.api.post(
             path=API_V1.MESSAGES,
@@ -381,8 +915,8 @@ class TolokaClient(object):
         )
         return res
 
-    async def send_bonus(self, json, params=None) -> Any:
-        res = await self.api.post(path=API_V1.BONUS, headers=self.headers, json=json, params=params)
+    async def send_bonus(self, json, params=None, **kwargs) -> Any:
+        res = await self.api.post(**kwargs, path=API_V1.BONUS, headers=self.headers, json=json, params=params)
         return res
 
     async def get_operation_info(self, operation_id) -> Any:
@@ -392,6 +926,14 @@ class TolokaClient(object):
         )
         return res
 
+    async def wait_operation(self, operation_id, timeout: float = None) -> dict:
+        """
+        Wait until operation is finished and return its info.
+        All waiting operations are polled together by self.operations watcher.
+        Raise OperationTimeoutError after timeout seconds.
+        """
+        return await self.operations.wait(operation_id, timeout)
+
     async def update_pool(self, pool_id: int, pool_params) -> Any:
         return await self.api.put(path=f'{API_V1.POOLS}/{pool_id}', headers=self.headers, json=pool_params)
 
@@ -403,119 +945,385 @@ class TolokaClient(object):
         """
         Return toloka amount of money in toloka account
         """
-        res = await self.api.get(path=API_V1.BALANCE, headers=self.headers)
+        res = await self.api.get(path=API_V1.BALANCE, headers=self.headers, priority=RequestPriority.INTERACTIVE)
         return res
 
     async def _start_aggregating_solutions(self, params) -> Any:
         res = await self.api.post(path=API_V1.AGGREGATE, headers=self.headers, json=params)
         return res
 
-    async def _get_aggregated_solutions(self, operation_id, params='') -> Any:
+    async def _get_aggregated_solutions(self, operation_id, params=None) -> Any:
         res = await self.api.get(
-            path=f'{API_V1.AGGREGATED_SOLUTIONS}/{operation_id}{params}',
+            path=f'{API_V1.AGGREGATED_SOLUTIONS}{operation_id}',
             headers=self.headers,
+            params=params,
         )
         return res
 
+    def _iter_aggregated_solutions(self, operation_id, limit=500, pages: bool = False) -> AsyncIterator:
+        solutions = iter_cursor_pages(
+            lambda p: self._get_aggregated_solutions(operation_id, p),
+            {'limit': limit, 'sort': 'task_id'},
+            cursor_param='task_id_gt',
+            cursor_field='task_id',
+        )
+        return solutions if pages else iter_items(solutions)
+
     async def _get_all_aggregated_solutions(self, operation_id, limit=500) -> list:
-        results = []
-        params = f'?limit={limit}&sort=task_id'
-        aggr_results = await self._get_aggregated_solutions(operation_id, params)
-        results.extend(aggr_results.get('items'))
-        log.debug(len(results))
-        while aggr_results['has_more']:
-            last_item_task_id = aggr_results.get('items')[-1]['task_id']
-            next_task_params = f'{params}&task_id_gt={last_item_task_id}'
-            aggr_results = await self._get_aggregated_solutions(operation_id, next_task_params)
-            results.extend(aggr_results['items'])
-            log.debug(len(results))
-        return results
+        return [solution async for solution in self._iter_aggregated_solutions(operation_id, limit)]
 
     async def change_pool_priority(self, pool_id: int, priority: int):
         pool_settings: dict = await self.get_pool(pool_id)
         pool_settings['priority'] = priority
-        res = self.patch_pool(pool_id, pool_settings)
+        res = await self.patch_pool(pool_id, pool_settings)
         return res
 
     async def send_bonus_users(self, user_links: list, bonus: float, data: dict, private_comment: str = 'accepted'):
-        user_bonuses = {}
-        for user in user_links:
-            if user in [u for u in user_bonuses.keys()]:
-                user_bonuses[user] = user_bonuses.get(user) + 1
-            else:
-                user_bonuses[user] = 1
-
-        bonus_params = {'async_mode': 'true', 'skip_invalid_items': 'true'}
-        jsons = []
-        for k, v in user_bonuses.items():
-            jsons.append({
-                'user_id': k,
-                'amount': round(v * bonus, 2),
-                'private_comment': private_comment,
-                'public_title': {
-                    'RU': f'{data["title"]}'
-                },
-                'public_message': {
-                    'RU': f'{data["body"]}'
-                },
-            })
-        log.info(f'total users: {len(jsons)}')
-        log.info(f"total money: {sum(a['amount'] for a in jsons)}")
-        operation = await self.send_bonus(jsons, bonus_params)
-        if operation.get('id'):
-            while True:
-                status_ = await self.get_operation_info(operation['id'])
-                status = status_.get('status')
-                if status in ('PENDING', 'RUNNING'):
-                    time.sleep(5)
-                elif status == 'FAIL':
-                    return False
-                else:
-                    break
-            return True
+        """
+        Pay every user bonus * number of times user appears in user_links.
+        Return False if some bonuses are not paid or unknown, send_bonuses report has per user outcomes.
+        """
+        user_bonuses = Counter(user_links)
+        bonuses = ({
+            'user_id': user,
+            'amount': round(count * bonus, 2),
+            'private_comment': private_comment,
+            'public_title': {
+                'RU': f'{data["title"]}'
+            },
+            'public_message': {
+                'RU': f'{data["body"]}'
+            },
+        } for user, count in user_bonuses.items())
+        log.info(f'total users: {len(user_bonuses)}')
+        log.info(f'total money: {round(sum(user_bonuses.values()) * bonus, 2)}')
+        report = await self.send_bonuses(bonuses)
+        return report['paid_count'] == report['total_count']
+
+    async def send_bonuses(self,
+                           bonuses: Union[Iterable[dict], AsyncIterable[dict]],
+                           chunk_size: int = 10000,
+                           concurrency: int = 4,
+                           max_attempts: int = 3,
+                           params: dict = None) -> dict:
+        """
+        Send bonuses ({'user_id': ..., 'amount': ..., ...}) as several concurrent async operations.
+        Every chunk has one operation_id for all its attempts. Lost request is waited for by this id and
+        sent again (with the same id) only when its operation is not found, so toloka deduplicates it
+        and bonuses are never paid twice. Bonuses of an operation with unknown result, or still not found
+        after max_attempts, are reported as UNKNOWN with operation_id to check it or to resend them with it.
+        Return report:
+            {'total_count': 2, 'paid_count': 1, 'failed_count': 1, 'unknown_count': 0,
+             'paid_amount': 0.5, 'operations': [...],
+             'items': [{'index': 0, 'user_id': ..., 'amount': 0.5, 'status': 'PAID', 'operation_id': ...,
+                        'output': {...}}, ...]}
+        """
+        bonus_params = {'async_mode': 'true', 'skip_invalid_items': 'true', **(params or {})}
+        semaphore = asyncio.Semaphore(concurrency)
+        sends = []
+        offset = 0
+        try:
+            async for chunk in iter_chunks(bonuses, chunk_size):
+                await semaphore.acquire()
+                send = asyncio.ensure_future(self._send_bonuses_chunk(chunk, offset, bonus_params, max_attempts))
+                send.add_done_callback(lambda _: semaphore.release())
+                sends.append(send)
+                offset += len(chunk)
+            reports = await asyncio.gather(*sends)
+        except BaseException:
+            for send in sends:
+                send.cancel()
+            raise
+
+        items = [item for report in reports for item in report['items']]
+        statuses = Counter(item['status'] for item in items)
+        return {
+            'total_count': len(items),
+            'paid_count': statuses[BonusResult.PAID],
+            'failed_count': statuses[BonusResult.FAILED],
+            'unknown_count': statuses[BonusResult.UNKNOWN],
+            'paid_amount': round(sum(item['amount'] for item in items if item['status'] == BonusResult.PAID), 2),
+            'operations': [operation for report in reports for operation in report['operations']],
+            'items': items,
+        }
+
+    async def _send_bonuses_chunk(self, chunk: List[dict], offset: int, params: dict, max_attempts: int) -> dict:
+        items = [{
+            'index': offset + i,
+            'user_id': bonus.get('user_id'),
+            'amount': bonus.get('amount'),
+            'status': BonusResult.FAILED,
+            'operation_id': None,
+            'output': None,
+        } for i, bonus in enumerate(chunk)]
+        operations = []
+        operation_id = str(uuid.uuid4())
+        for attempt in range(max_attempts):
+            try:
+                operation = await self._submit_operation(API_V1.BONUS, chunk, {**params, 'operation_id': operation_id})
+            except OperationNotFoundError:
+                log.error(f'Bonuses chunk {offset}:{offset + len(chunk)} was not created, attempt {attempt + 1}')
+                # toloka may still create it late, only resending with the same operation_id is safe
+                for item in items:
+                    item['operation_id'] = operation_id
+                    item['status'] = BonusResult.UNKNOWN
+                continue
+            except RequestError:
+                log.error(f'Bonuses chunk {offset}:{offset + len(chunk)} was rejected', exc_info=True)
+                for item in items:
+                    item['status'] = BonusResult.FAILED
+                break
+            operations.append(operation)
+            for item in items:
+                item['operation_id'] = operation['id']
+                item['status'] = BonusResult.UNKNOWN
+            operation_log = await self.get_operation_log(operation['id'])
+            if isinstance(operation_log, list) and len(operation_log) == len(chunk):
+                for item, entry in zip(items, operation_log):
+                    item['status'] = BonusResult.PAID if entry.get('success') else BonusResult.FAILED
+                    item['output'] = entry.get('output')
+            elif operation.get('status') == 'SUCCESS':
+                for item in items:
+                    item['status'] = BonusResult.PAID
+            break
+        return {'operations': operations, 'items': items}
 
     async def get_aggregated_solutions(self, pool_id: int, skill_id: int, field_names: list):
         """
         Return aggregated solutions 
         """
-        params = {
-            'pool_id': pool_id,
-            'type': 'WEIGHTED_DYNAMIC_OVERLAP',
-            'answer_weight_skill_id': skill_id,
-            'fields': [{
-                'name': n
-            } for n in field_names]
-        }
-
-        operation = await self._start_aggregating_solutions(params)
+        operation = await self._start_aggregating_solutions(_aggregation_params(pool_id, skill_id, field_names))
         try:
             operation_id = operation['id']
         except KeyError:
             log.error('', exc_info=True)
             raise ValueError(f'{operation}')
         log.info(f'created operation {operation_id}')
-        while (await self.get_operation_info(operation_id)).get('status') in ('PENDING', 'RUNNING'):
-            await asyncio.sleep(5)
+        await self.wait_operation(operation_id)
         solutions = await self._get_all_aggregated_solutions(operation_id)
         return solutions
 
+    async def iter_pools_aggregated_solutions(self,
+                                              specs: Iterable[tuple],
+                                              concurrency: int = 8,
+                                              pages: bool = False,
+                                              limit: int = 500,
+                                              timeout: float = None,
+                                              errors: dict = None) -> AsyncIterator[tuple]:
+        """
+        Aggregate solutions of many pools concurrently and yield (pool_id, solution) as soon as they're ready.
+        specs: (pool_id, skill_id, field_names) tuples
+        concurrency: pools whose solutions are read at a time. Aggregations of all pools are started at once
+            and waited for by the shared operation watcher, requests are limited by client rate limiter
+        pages: yield (pool_id, list of solutions) instead
+        timeout: seconds to wait for every aggregation operation
+        errors: if set, pool_id: error of pools that failed, they are skipped and logged anyway
+        Solutions of one pool are in order, solutions of different pools are interleaved.
+        """
+        queue: asyncio.Queue = asyncio.Queue(concurrency * 2)
+        semaphore = asyncio.Semaphore(concurrency)
+        errors = {} if errors is None else errors
+        tasks = [
+            asyncio.ensure_future(self._aggregate_pool(spec, semaphore, queue, limit, timeout, errors))
+            for spec in specs
+        ]
+
+        async def produce():
+            try:
+                await asyncio.gather(*tasks)
+            finally:
+                await queue.put(None)
+
+        producer = asyncio.ensure_future(produce())
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                if pages:
+                    yield item
+                else:
+                    pool_id, page = item
+                    for solution in page:
+                        yield pool_id, solution
+            await producer
+        finally:
+            for task in tasks:
+                task.cancel()
+            producer.cancel()
+
+    async def _aggregate_pool(self, spec: tuple, semaphore: asyncio.Semaphore, queue: asyncio.Queue, limit: int,
+                              timeout: Optional[float], errors: dict):
+        pool_id, skill_id, field_names = spec
+        try:
+            operation = await self._start_aggregating_solutions(_aggregation_params(pool_id, skill_id, field_names))
+            if not isinstance(operation, dict) or 'id' not in operation:
+                raise ValueError(f'{operation}')
+            log.info(f'pool {pool_id}: created operation {operation["id"]}')
+            operation = await self.wait_operation(operation['id'], timeout)
+            if operation.get('status') != 'SUCCESS':
+                raise ValueError(f'{operation}')
+            async with semaphore:
+                async for page in self._iter_aggregated_solutions(operation['id'], limit, pages=True):
+                    await queue.put((pool_id, page))
+        except (TolokaError, ValueError) as e:
+            log.error(f'pool {pool_id}: aggregation failed', exc_info=True)
+            errors[pool_id] = e
+
+    async def export_pools_aggregated_solutions(self, specs: Iterable[tuple], path: str, concurrency: int = 8,
+                                                **kwargs) -> dict:
+        """
+        Write aggregated solutions of many pools to json lines file as they arrive.
+        path: file path, with {pool_id} in it every pool is written to its own file
+        Return {'solutions': {pool_id: count}, 'errors': {pool_id: error}}.
+        """
+        counts: dict = {}
+        errors: dict = {}
+        files: dict = {}
+        try:
+            async for pool_id, page in self.iter_pools_aggregated_solutions(specs, concurrency, pages=True,
+                                                                            errors=errors, **kwargs):
+                file_path = path.format(pool_id=pool_id)
+                f = files.get(file_path)
+                if f is None:
+                    f = files[file_path] = open(file_path, 'wb')
+                f.write(b''.join(self.api.codec.dumps(solution) + b'\n' for solution in page))
+                counts[pool_id] = counts.get(pool_id, 0) + len(page)
+        finally:
+            for f in files.values():
+                f.close()
+        return {'solutions': counts, 'errors': errors}
+
     async def batch_upload_tasks(self, tasks: List[dict]):
         """
         Asynchrous uploading tasks to toloka
         """
         task_params = {'async_mode': 'true', 'allow_defaults': 'true'}
         operation = await self.create_task(tasks, task_params, timeout=20)
-        while (await self.get_operation_info(operation['id'])).get('status') in ('PENDING', 'RUNNING'):
-            await asyncio.sleep(5)
-        return await self.get_operation_info(operation['id'])
+        return await self.wait_operation(operation['id'])
+
+    async def upload_tasks(self,
+                           tasks: Union[Iterable[dict], AsyncIterable[dict]],
+                           chunk_size: int = 10000,
+                           max_chunk_bytes: int = 8 * 1024 * 1024,
+                           concurrency: int = 4,
+                           max_attempts: int = 3,
+                           params: dict = None) -> dict:
+        """
+        Upload any number of tasks as several concurrent async operations.
+        tasks: list, iterable or async iterable, read lazily chunk by chunk
+        Failed chunks are resubmitted up to max_attempts times. Chunk keeps its operation_id until its operation
+        surely failed, so a chunk whose request was lost is waited for and sent again under the same id
+        instead of being created twice.
+        Chunk whose operation is still not found after max_attempts has success None (unknown),
+        it may be created late, so check or resend it only with its operation_id.
+        Return merged report:
+            {'total_count': 2, 'success_count': 1, 'failed_count': 1, 'unknown_count': 0, 'operations': [...],
+             'items': [{'index': 0, 'success': True, 'output': {'task_id': ...}, 'operation_id': ...}, ...]}
+        """
+        task_params = {'async_mode': 'true', 'allow_defaults': 'true', **(params or {})}
+        semaphore = asyncio.Semaphore(concurrency)
+        uploads = []
+        offset = 0
+        try:
+            async for chunk in iter_chunks(tasks, chunk_size, max_chunk_bytes):
+                await semaphore.acquire()
+                upload = asyncio.ensure_future(self._upload_tasks_chunk(chunk, offset, task_params, max_attempts))
+                upload.add_done_callback(lambda _: semaphore.release())
+                uploads.append(upload)
+                offset += len(chunk)
+            chunk_reports = await asyncio.gather(*uploads)
+        except BaseException:
+            for upload in uploads:
+                upload.cancel()
+            raise
+
+        items = [item for report in chunk_reports for item in report['items']]
+        return {
+            'total_count': len(items),
+            'success_count': sum(item['success'] is True for item in items),
+            'failed_count': sum(item['success'] is False for item in items),
+            'unknown_count': sum(item['success'] is None for item in items),
+            'operations': [report['operation'] for report in chunk_reports],
+            'items': items,
+        }
+
+    async def _upload_tasks_chunk(self, chunk: List[dict], offset: int, params: dict, max_attempts: int) -> dict:
+        operation: dict = {}
+        operation_id = str(uuid.uuid4())
+        for attempt in range(max_attempts):
+            try:
+                operation = await self._submit_operation(API_V1.TASKS, chunk, {**params, 'operation_id': operation_id},
+                                                         timeout=TIMEOUT)
+            except OperationNotFoundError as e:
+                log.error(f'Tasks chunk {offset}:{offset + len(chunk)} was not created, attempt {attempt + 1}')
+                # toloka may still create it late, only resending with the same operation_id is safe
+                operation = {'id': operation_id, 'status': 'UNKNOWN', 'details': e.result}
+                continue
+            except RequestError as e:
+                log.error(f'Tasks chunk {offset}:{offset + len(chunk)} was rejected', exc_info=True)
+                operation = {'id': operation_id, 'status': 'FAIL', 'details': e.result}
+                break
+            if operation.get('status') == 'SUCCESS':
+                break
+            log.error(f'Tasks chunk {offset}:{offset + len(chunk)} failed, attempt {attempt + 1}: {operation}')
+            operation_id = str(uuid.uuid4())
+
+        success: Optional[bool] = operation.get('status') == 'SUCCESS'
+        operation_log = await self.get_operation_log(operation['id']) if success else None
+        if operation.get('status') == 'UNKNOWN':
+            success = None
+        if isinstance(operation_log, list) and len(operation_log) == len(chunk):
+            items = [{
+                'index': offset + i,
+                'success': bool(entry.get('success')),
+                'output': entry.get('output'),
+                'operation_id': operation['id'],
+            } for i, entry in enumerate(operation_log)]
+        else:
+            items = [{
+                'index': offset + i,
+                'success': success,
+                'output': None,
+                'operation_id': operation['id'],
+            } for i in range(len(chunk))]
+        return {'operation': operation, 'items': items}
+
+    async def _submit_operation(self, path: str, json: Any, params: dict, **kwargs) -> dict:
+        """
+        Start async operation with operation_id from params and wait until it's finished.
+        Lost response, 5xx and 409 conflict (operation with this id already exists) are waited for by the same id,
+        so request sent again with the same operation_id never creates a second operation.
+        Raise RequestError if toloka rejected request, OperationNotFoundError if operation wasn't created.
+        """
+        operation_id = params['operation_id']
+        try:
+            status, res = await self.api.post_with_status(path,
+                                                          json=json,
+                                                          params=params,
+                                                          headers=self.headers,
+                                                          priority=RequestPriority.BULK,
+                                                          **kwargs)
+        except RequestError:
+            log.error(f'Operation {operation_id} request failed', exc_info=True)
+        else:
+            if status is not None and 400 <= status < 500 and status != 409:
+                raise RequestError('POST', f'{self.api.host}{path}', 1, status, res)
+        return await self.wait_operation(operation_id)
+
+    async def get_operation_log(self, operation_id) -> Any:
+        res = await self.api.get(
+            path=f'{API_V1.OPERATIONS}/{operation_id}/log',
+            headers=self.headers,
+        )
+        return res
 
     async def get_operation_result(self, operation) -> dict:
         """
         Get result from operation untill it done.
+        Raise OperationNotFoundError if there is no such operation.
         """
-        while (await self.get_operation_info(operation['id'])).get('status') in ('PENDING', 'RUNNING'):
-            await asyncio.sleep(5)
-        res = await self.get_operation_info(operation['id'])
+        res = await self.wait_operation(operation['id'])
         return res['details']
 
     async def change_pool_name(self, pool_id: int, name: str):
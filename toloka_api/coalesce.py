@@ -0,0 +1,48 @@
+import asyncio
+from copy import deepcopy
+from typing import Any, Awaitable, Callable, Dict
+
+
+class RequestCoalescer:
+    """
+    Share one in-flight request between concurrent callers asking for the same thing.
+
+    The first caller of a key makes the request, the rest wait for its result and get own copies of it.
+    With window > 0 the first caller waits that many seconds before sending,
+    so callers arriving right after it are served by the same request too.
+    """
+
+    def __init__(self, window: float = 0.0, enabled: bool = True):
+        self.window = window
+        self.enabled = enabled
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
+    async def run(self, key: str, func: Callable[[], Awaitable]) -> Any:
+        if not self.enabled:
+            return await func()
+        future = self._in_flight.get(key)
+        if future is not None:
+            # cancellation of this caller is raised here and leaves shared future alone,
+            # request is sent again only for callers still waiting when the first caller was cancelled
+            await asyncio.wait((future, ))
+            if future.cancelled():
+                return await self.run(key, func)
+            return deepcopy(future.result())
+
+        future = self._in_flight[key] = asyncio.get_running_loop().create_future()
+        try:
+            if self.window:
+                await asyncio.sleep(self.window)
+            result = await func()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._in_flight[key]
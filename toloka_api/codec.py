@@ -0,0 +1,42 @@
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+class JsonCodec:
+    """
+    Serialize request bodies to bytes and decode response bytes, stdlib json.
+    Subclass it to plug in another json library.
+    """
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode()
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec(JsonCodec):
+    """
+    orjson codec, several times faster on big pages and task uploads.
+    Accepts what stdlib json does: numpy values, non-str dict keys, objects only stdlib json serializes
+    are dumped by it.
+    """
+
+    def dumps(self, obj: Any) -> bytes:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+        except TypeError:
+            return super().dumps(obj)
+
+    def loads(self, data: bytes) -> Any:
+        return orjson.loads(data)
+
+
+def default_codec() -> JsonCodec:
+    """orjson codec if orjson is installed, stdlib one otherwise"""
+    return OrjsonCodec() if orjson is not None else JsonCodec()
@@ -28,6 +28,13 @@ class TaskAssigmentResult:
     NOT_FOUND: str = 'NOT_FOUND'
 
 
+@dataclass
+class BonusResult:
+    PAID: str = 'PAID'
+    FAILED: str = 'FAILED'
+    UNKNOWN: str = 'UNKNOWN'
+
+
 @dataclass
 class PoolStatus:
     OPEN: str = 'OPEN'
@@ -45,6 +52,13 @@ class AssigmentStatus:
     EXPIRED: str = 'EXPIRED'
 
 
+@dataclass
+class RequestPriority:
+    INTERACTIVE: str = 'interactive'
+    NORMAL: str = 'normal'
+    BULK: str = 'bulk'
+
+
 @dataclass
 class PoolType:
     REGULAR: str = 'REGULAR'
@@ -0,0 +1,89 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from toloka_api.codec import default_codec
+
+PAGE_FIELDS = ('items', 'content')
+# keys pagination needs, they are kept in projected items even if fields don't list them
+CURSOR_FIELDS = ('id', 'task_id')
+
+_codec = default_codec()
+
+
+def decode_body(body: bytes, fields: Optional[Tuple[str, ...]] = None) -> Any:
+    """
+    Decode json body, with fields keep only these keys of every item of a list page.
+    Runs in worker processes, so it's a module level function.
+    """
+    result = _codec.loads(body)
+    if fields is not None and isinstance(result, dict):
+        for page_field in PAGE_FIELDS:
+            items = result.get(page_field)
+            if isinstance(items, list):
+                result[page_field] = [{key: item[key] for key in fields if key in item} for item in items]
+    return result
+
+
+def project_body(body: bytes, fields: Tuple[str, ...]) -> bytes:
+    """
+    Decode json body, project items of a list page to fields and encode it back.
+    Runs in worker processes: projected json bytes are much cheaper to send back and decode
+    on the event loop than pickled dicts of the whole page.
+    """
+    return _codec.dumps(decode_body(body, fields))
+
+
+class ResponseDecoder:
+    """
+    Decode big list pages of projected paths in a process pool, so json parsing of large pages uses several cores
+    and doesn't block the event loop. Workers parse the whole page and send back only projected items as json,
+    which the event loop decodes. Bodies smaller than threshold bytes and bodies of paths without fields
+    are decoded in place: without projection the event loop would unpickle as much as it would parse.
+
+    fields: {api path: keys to keep in items of its list pages}, e.g.
+        {API_V1.ASSIGMENTS: ('id', 'user_id', 'status', 'submitted')}
+        id and task_id (pagination cursors) are always kept.
+        Projection applies to all list requests of the path made by the client, e.g. sync_assigments saves
+        projected asigments to its store, so list there every key you read later.
+    executor: process pool by default (json decoders hold the GIL, so threads don't add cores),
+        an own executor is not shut down by close().
+
+    Example:
+        client = TolokaClient(oauth_token, decoder=ResponseDecoder(workers=4, fields={API_V1.ASSIGMENTS: ('status',)}))
+    """
+
+    def __init__(self,
+                 threshold: int = 256 * 1024,
+                 workers: Optional[int] = None,
+                 fields: Dict[str, Sequence[str]] = None,
+                 executor: Executor = None):
+        self.threshold = threshold
+        self.workers = workers
+        self.fields = {
+            path.rstrip('/'): tuple(keys) + tuple(key for key in CURSOR_FIELDS if key not in keys)
+            for path, keys in (fields or {}).items()
+        }
+        self._executor = executor
+        self._owns_executor = executor is None
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(self.workers)
+        return self._executor
+
+    def get_fields(self, path: str) -> Optional[Tuple[str, ...]]:
+        return self.fields.get(path.split('?')[0].rstrip('/'))
+
+    async def decode(self, path: str, body: bytes) -> Any:
+        fields = self.get_fields(path)
+        if fields is None or len(body) < self.threshold:
+            return decode_body(body, fields)
+        projected = await asyncio.get_running_loop().run_in_executor(self.executor, project_body, body, fields)
+        return _codec.loads(projected)
+
+    def close(self):
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
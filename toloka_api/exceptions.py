@@ -0,0 +1,47 @@
+from typing import Any, Optional
+
+
+class TolokaError(Exception):
+    """Base class for toloka_api errors"""
+
+
+class RequestError(TolokaError):
+    """
+    Request to toloka failed and can't be retried anymore.
+    Keeps last response status and body (or transport error in __cause__).
+    """
+
+    def __init__(self, method: str, url: str, attempts: int, status: Optional[int] = None, result: Any = None):
+        self.method = method
+        self.url = url
+        self.attempts = attempts
+        self.status = status
+        self.result = result
+        super().__init__(f'{method} {url} failed after {attempts} attempt(s), status: {status}, result: {result}')
+
+
+class OperationTimeoutError(TolokaError):
+    """Operation didn't finish in time"""
+
+    def __init__(self, operation_id: str, timeout: float):
+        self.operation_id = operation_id
+        self.timeout = timeout
+        super().__init__(f'Operation {operation_id} is not finished after {timeout} seconds')
+
+
+class OperationNotFoundError(TolokaError):
+    """Operation status can't be read, toloka answers with an error (e.g. DOES_NOT_EXIST) instead"""
+
+    def __init__(self, operation_id: str, result: Any = None):
+        self.operation_id = operation_id
+        self.result = result
+        super().__init__(f'Operation {operation_id} is not found, result: {result}')
+
+
+class CassetteError(TolokaError):
+    """Replayed request is not recorded in cassette"""
+
+    def __init__(self, method: str, key: str):
+        self.method = method
+        self.key = key
+        super().__init__(f'{method} request {key} is not found in cassette')
@@ -0,0 +1,203 @@
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from toloka_api.codec import default_codec
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover
+    pa = None
+    pq = None
+
+_codec = default_codec()
+
+# column name: (dotted path in item, column type)
+Columns = Dict[str, Tuple[str, str]]
+
+ASSIGMENT_COLUMNS: Columns = {
+    'id': ('id', 'string'),
+    'task_suite_id': ('task_suite_id', 'string'),
+    'pool_id': ('pool_id', 'int'),
+    'user_id': ('user_id', 'string'),
+    'status': ('status', 'string'),
+    'reward': ('reward', 'float'),
+    'created': ('created', 'timestamp'),
+    'submitted': ('submitted', 'timestamp'),
+    'accepted': ('accepted', 'timestamp'),
+    'rejected': ('rejected', 'timestamp'),
+    'tasks': ('tasks', 'json'),
+    'solutions': ('solutions', 'json'),
+}
+
+TASK_COLUMNS: Columns = {
+    'id': ('id', 'string'),
+    'pool_id': ('pool_id', 'int'),
+    'overlap': ('overlap', 'int'),
+    'created': ('created', 'timestamp'),
+    'input_values': ('input_values', 'json'),
+    'known_solutions': ('known_solutions', 'json'),
+}
+
+FORMATS = ('parquet', 'arrow')
+
+
+def _arrow_type(column_type: str) -> Any:
+    return {
+        'string': pa.string(),
+        'int': pa.int64(),
+        'float': pa.float64(),
+        'bool': pa.bool_(),
+        'timestamp': pa.timestamp('ms'),
+        'json': pa.string(),
+    }[column_type]
+
+
+def _to_bool(value: Any) -> bool:
+    return value.lower() == 'true' if isinstance(value, str) else bool(value)
+
+
+# api returns some numbers as strings (e.g. pool_id "21"), values of these columns are converted
+_CONVERTERS = {'int': int, 'float': float, 'bool': _to_bool}
+
+
+def _compile_path(path: str) -> Tuple[Any, ...]:
+    return tuple(int(key) if key.isdigit() else key for key in path.split('.'))
+
+
+def _extract(item: Any, path: Tuple[Any, ...]) -> Any:
+    for key in path:
+        try:
+            item = item[key]
+        except (KeyError, IndexError, TypeError):
+            return None
+    return item
+
+
+class ColumnBuffer:
+    """
+    Column buffers for items of one record batch.
+    """
+
+    def __init__(self, columns: Columns):
+        if pa is None:
+            raise ImportError('pyarrow is required for columnar export: pip install pyarrow')
+        self._columns = [(name, _compile_path(path), column_type) for name, (path, column_type) in columns.items()]
+        self.schema = pa.schema([(name, _arrow_type(column_type)) for name, _, column_type in self._columns])
+        self._buffers: List[List[Any]] = [[] for _ in self._columns]
+
+    def __len__(self) -> int:
+        return len(self._buffers[0]) if self._buffers else 0
+
+    def append_page(self, items: List[dict]):
+        for buffer, (_, path, column_type) in zip(self._buffers, self._columns):
+            values = [_extract(item, path) for item in items]
+            if column_type == 'json':
+                values = [None if value is None else _codec.dumps(value).decode() for value in values]
+            elif column_type == 'string':
+                values = [value if value is None or isinstance(value, str) else str(value) for value in values]
+            elif column_type in _CONVERTERS:
+                convert = _CONVERTERS[column_type]
+                values = [None if value is None or value == '' else convert(value) for value in values]
+            buffer.extend(values)
+
+    def record_batch(self) -> Optional[Any]:
+        """Take buffered rows as arrow RecordBatch, None if buffers are empty"""
+        if not len(self):
+            return None
+        arrays = []
+        for buffer, (_, _, column_type) in zip(self._buffers, self._columns):
+            if column_type == 'timestamp':
+                arrays.append(pa.array(buffer, pa.string()).cast(pa.timestamp('ms')))
+            else:
+                arrays.append(pa.array(buffer, _arrow_type(column_type)))
+        self._buffers = [[] for _ in self._columns]
+        return pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+
+
+class ColumnarWriter:
+    """
+    Write items page by page into parquet or arrow ipc file.
+    Items are collected into column buffers and written out as a row group every row_group_size rows,
+    so memory doesn't depend on total number of items.
+
+    Example:
+        with ColumnarWriter('assigments.parquet', ASSIGMENT_COLUMNS) as writer:
+            async for page in client.iter_assigments(pool_id, pages=True):
+                writer.write_page(page)
+    """
+
+    def __init__(self, path: str, columns: Columns, format: str = 'parquet', row_group_size: int = 100000):
+        if format not in FORMATS:
+            raise ValueError(f'format should be one of {FORMATS}, got {format!r}')
+        self.path = path
+        self.format = format
+        self.row_group_size = row_group_size
+        self.rows = 0
+        self._buffer = ColumnBuffer(columns)
+        self._writer: Any = None
+
+    def _open(self):
+        if self.format == 'parquet':
+            self._writer = pq.ParquetWriter(self.path, self._buffer.schema)
+        else:
+            self._writer = pa.ipc.new_file(self.path, self._buffer.schema)
+
+    def write_page(self, items: List[dict]):
+        self._buffer.append_page(items)
+        if len(self._buffer) >= self.row_group_size:
+            self.flush()
+
+    def flush(self):
+        batch = self._buffer.record_batch()
+        if batch is None:
+            return
+        if self._writer is None:
+            self._open()
+        self._writer.write_batch(batch)
+        self.rows += batch.num_rows
+
+    def close(self):
+        self.flush()
+        if self._writer is None:
+            self._open()
+        self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        elif self._writer is not None:
+            self._writer.close()
+
+
+async def iter_record_batches(pages: AsyncIterator[List[dict]],
+                              columns: Columns,
+                              batch_size: int = 100000) -> AsyncIterator[Any]:
+    """
+    Turn pages of items into arrow RecordBatches of batch_size rows.
+    Use batch.column(name).to_numpy() to get numpy arrays.
+    """
+    buffer = ColumnBuffer(columns)
+    async for page in pages:
+        buffer.append_page(page)
+        if len(buffer) >= batch_size:
+            yield buffer.record_batch()
+    batch = buffer.record_batch()
+    if batch is not None:
+        yield batch
+
+
+async def export_pages(pages: AsyncIterator[List[dict]],
+                       path: str,
+                       columns: Columns,
+                       format: str = 'parquet',
+                       row_group_size: int = 100000) -> int:
+    """
+    Write pages of items into parquet or arrow ipc file. Return number of written rows.
+    """
+    with ColumnarWriter(path, columns, format, row_group_size) as writer:
+        async for page in pages:
+            writer.write_page(page)
+    return writer.rows
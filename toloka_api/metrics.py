@@ -0,0 +1,249 @@
+import time
+from bisect import bisect_left
+from collections import Counter
+from dataclasses import fields
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from aiohttp import TraceConfig
+
+from toloka_api.constants import API_V1
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+PHASES = ('total', 'dns', 'connect', 'ttfb', 'body')
+
+_API_PREFIXES = sorted((f.default.rstrip('/') for f in fields(API_V1)), key=len, reverse=True)  # type: ignore
+
+
+def endpoint_template(path: str) -> str:
+    """
+    Replace resource id in api path with {id}:
+        /api/v1/pools/123/open -> /api/v1/pools/{id}/open
+    """
+    path = path.split('?')[0]
+    for prefix in _API_PREFIXES:
+        if path == prefix or path.startswith(f'{prefix}/'):
+            rest = [segment for segment in path[len(prefix):].split('/') if segment]
+            if rest:
+                rest[0] = '{id}'
+            return '/'.join([prefix, *rest])
+    return path
+
+
+class Histogram:
+    __slots__ = ('counts', 'sum', 'count')
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding q-th quantile"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS + (float('inf'), ), self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float('inf')
+
+
+class EndpointStats:
+    __slots__ = ('statuses', 'retries', 'throttled', 'errors', 'request_bytes', 'response_bytes', 'items', 'latency')
+
+    def __init__(self):
+        self.statuses: Counter = Counter()
+        self.retries = 0
+        self.throttled = 0
+        self.errors = 0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.items = 0
+        self.latency = {phase: Histogram() for phase in PHASES}
+
+    @property
+    def requests(self) -> int:
+        return sum(self.statuses.values())
+
+
+class RequestRecord(NamedTuple):
+    """One finished http request, passed to listeners"""
+    method: str
+    endpoint: str
+    status: int
+    total: float
+    dns: Optional[float]
+    connect: Optional[float]
+    ttfb: float
+    body: float
+    request_bytes: int
+    response_bytes: int
+    items: int
+    reused_connection: bool
+
+
+class RequestTimings:
+    """Timings of one request attempt, filled by AsyncRest and aiohttp trace callbacks"""
+    __slots__ = ('method', 'endpoint', 'started', 'headers_at', 'dns', 'connect', 'reused')
+
+    def __init__(self, method: str, endpoint: str):
+        self.method = method
+        self.endpoint = endpoint
+        self.started = time.perf_counter()
+        self.headers_at: Optional[float] = None
+        self.dns: Optional[float] = None
+        self.connect: Optional[float] = None
+        self.reused = False
+
+    def headers_received(self):
+        self.headers_at = time.perf_counter()
+
+
+class RequestMetrics:
+    """
+    Per endpoint template request metrics of AsyncRest: status codes, retries, 429s, transport errors,
+    request/response bytes, items in list pages (number of requests of a list endpoint is its page count)
+    and latency histograms of request phases: total, dns, connect, ttfb (headers), body.
+
+    dns and connect are taken from aiohttp TraceConfig, so they're measured only for sessions
+    created by the client itself. Every finished request is also passed to listeners as RequestRecord.
+
+    Example:
+        metrics = RequestMetrics()
+        client = TolokaClient(oauth_token, metrics=metrics)
+        ...
+        print(metrics.to_prometheus())
+    """
+
+    def __init__(self, listeners: List[Callable[[RequestRecord], Any]] = None):
+        self.listeners = list(listeners or [])
+        self.endpoints: Dict[Tuple[str, str], EndpointStats] = {}
+
+    def add_listener(self, listener: Callable[[RequestRecord], Any]):
+        self.listeners.append(listener)
+
+    def stats(self, method: str, path: str) -> EndpointStats:
+        key = (method, endpoint_template(path))
+        stats = self.endpoints.get(key)
+        if stats is None:
+            stats = self.endpoints[key] = EndpointStats()
+        return stats
+
+    def start(self, method: str, path: str) -> RequestTimings:
+        return RequestTimings(method, endpoint_template(path))
+
+    def finish(self, timings: RequestTimings, status: int, request_bytes: int, response_bytes: int, result: Any):
+        now = time.perf_counter()
+        headers_at = timings.headers_at or now
+        items = 0
+        if isinstance(result, dict):
+            page = result.get('items', result.get('content'))
+            items = len(page) if isinstance(page, list) else 0
+        record = RequestRecord(timings.method, timings.endpoint, status, now - timings.started, timings.dns,
+                               timings.connect, headers_at - timings.started, now - headers_at, request_bytes,
+                               response_bytes, items, timings.reused)
+
+        stats = self.stats(timings.method, timings.endpoint)
+        stats.statuses[status] += 1
+        stats.request_bytes += request_bytes
+        stats.response_bytes += response_bytes
+        stats.items += items
+        for phase in PHASES:
+            value = getattr(record, phase)
+            if value is not None:
+                stats.latency[phase].observe(value)
+        for listener in self.listeners:
+            listener(record)
+
+    def record_retry(self, method: str, path: str, throttled: bool):
+        stats = self.stats(method, path)
+        stats.retries += 1
+        stats.throttled += throttled
+
+    def record_error(self, method: str, path: str):
+        self.stats(method, path).errors += 1
+
+    def trace_config(self) -> TraceConfig:
+        """aiohttp TraceConfig measuring dns resolution and connection setup"""
+
+        async def on_dns_start(session, context, params):
+            context.dns_started = time.perf_counter()
+
+        async def on_dns_end(session, context, params):
+            if isinstance(context.trace_request_ctx, RequestTimings):
+                context.trace_request_ctx.dns = time.perf_counter() - context.dns_started
+
+        async def on_connect_start(session, context, params):
+            context.connect_started = time.perf_counter()
+
+        async def on_connect_end(session, context, params):
+            if isinstance(context.trace_request_ctx, RequestTimings):
+                context.trace_request_ctx.connect = time.perf_counter() - context.connect_started
+
+        async def on_reuse(session, context, params):
+            if isinstance(context.trace_request_ctx, RequestTimings):
+                context.trace_request_ctx.reused = True
+
+        trace_config = TraceConfig()
+        trace_config.on_dns_resolvehost_start.append(on_dns_start)
+        trace_config.on_dns_resolvehost_end.append(on_dns_end)
+        trace_config.on_connection_create_start.append(on_connect_start)
+        trace_config.on_connection_create_end.append(on_connect_end)
+        trace_config.on_connection_reuseconn.append(on_reuse)
+        return trace_config
+
+    def summary(self) -> Dict[str, dict]:
+        """Short per endpoint summary: requests, statuses, retries, p50/p99 of total latency"""
+        return {
+            f'{method} {endpoint}': {
+                'requests': stats.requests,
+                'statuses': dict(stats.statuses),
+                'retries': stats.retries,
+                'throttled': stats.throttled,
+                'errors': stats.errors,
+                'items': stats.items,
+                'response_bytes': stats.response_bytes,
+                'p50': stats.latency['total'].quantile(0.5),
+                'p99': stats.latency['total'].quantile(0.99),
+            } for (method, endpoint), stats in self.endpoints.items()
+        }
+
+    def to_prometheus(self, prefix: str = 'toloka') -> str:
+        """Metrics in prometheus text exposition format"""
+        lines = []
+        counters = (
+            ('retries_total', 'retries'),
+            ('throttled_total', 'throttled'),
+            ('errors_total', 'errors'),
+            ('request_bytes_total', 'request_bytes'),
+            ('response_bytes_total', 'response_bytes'),
+            ('items_total', 'items'),
+        )
+        lines.append(f'# TYPE {prefix}_requests_total counter')
+        for (method, endpoint), stats in self.endpoints.items():
+            for status, count in stats.statuses.items():
+                labels = f'method="{method}",endpoint="{endpoint}",status="{status}"'
+                lines.append(f'{prefix}_requests_total{{{labels}}} {count}')
+        for name, attr in counters:
+            lines.append(f'# TYPE {prefix}_{name} counter')
+            for (method, endpoint), stats in self.endpoints.items():
+                lines.append(f'{prefix}_{name}{{method="{method}",endpoint="{endpoint}"}} {getattr(stats, attr)}')
+        lines.append(f'# TYPE {prefix}_request_duration_seconds histogram')
+        for (method, endpoint), stats in self.endpoints.items():
+            for phase, histogram in stats.latency.items():
+                labels = f'method="{method}",endpoint="{endpoint}",phase="{phase}"'
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS + (float('inf'), ), histogram.counts):
+                    cumulative += count
+                    le = '+Inf' if bound == float('inf') else bound
+                    lines.append(f'{prefix}_request_duration_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+                lines.append(f'{prefix}_request_duration_seconds_sum{{{labels}}} {histogram.sum}')
+                lines.append(f'{prefix}_request_duration_seconds_count{{{labels}}} {histogram.count}')
+        return '\n'.join(lines) + '\n'
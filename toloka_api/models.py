@@ -0,0 +1,192 @@
+import sys
+import zlib
+from array import array
+from dataclasses import fields
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from toloka_api.codec import default_codec
+from toloka_api.constants import AssigmentStatus, PoolStatus, TolokaTaskStatus
+
+_codec = default_codec()
+
+ASSIGMENT_STATUSES: Tuple[str, ...] = tuple(f.default for f in fields(AssigmentStatus))  # type: ignore
+_KNOWN_STRINGS = {
+    s: s
+    for s in ASSIGMENT_STATUSES + tuple(f.default for f in fields(TolokaTaskStatus)) +  # type: ignore
+    tuple(f.default for f in fields(PoolStatus))  # type: ignore
+}
+
+
+def parse_timestamp(value: Optional[str]) -> Optional[float]:
+    """Toloka UTC date string to unix timestamp"""
+    if not value:
+        return None
+    return datetime.fromisoformat(value.rstrip('Z')).replace(tzinfo=timezone.utc).timestamp()
+
+
+def _shared_str(value: Any) -> Any:
+    """Same string object for repeated values like statuses and user ids"""
+    if isinstance(value, str):
+        return _KNOWN_STRINGS.get(value) or sys.intern(value)
+    return value
+
+
+class _Record:
+    """
+    Compact record built from toloka json.
+    Frequently used fields are slots, dates are unix timestamps.
+    Everything else is kept encoded and decoded only when accessed.
+    """
+    __slots__ = ('_rest', )
+    _fields: Tuple[str, ...] = ()
+    _time_fields: Tuple[str, ...] = ()
+    _lazy_fields: Tuple[str, ...] = ()
+
+    @classmethod
+    def from_dict(cls, item: dict):
+        record = cls.__new__(cls)
+        rest = dict(item)
+        for name in cls._fields:
+            setattr(record, name, _shared_str(rest.pop(name, None)))
+        for name in cls._time_fields:
+            setattr(record, name, parse_timestamp(rest.pop(name, None)))
+        record._rest = _codec.dumps(rest) if rest else b''
+        return record
+
+    @property
+    def rest(self) -> dict:
+        """Fields which are not slots, decoded on every access"""
+        return _codec.loads(self._rest) if self._rest else {}
+
+    def __getattr__(self, name: str) -> Any:
+        if name in self._lazy_fields:
+            return self.rest.get(name)
+        raise AttributeError(f'{type(self).__name__!r} object has no attribute {name!r}')
+
+    def to_dict(self) -> dict:
+        item = {name: getattr(self, name) for name in self._fields}
+        for name in self._time_fields:
+            timestamp = getattr(self, name)
+            if timestamp is not None:
+                item[name] = datetime.fromtimestamp(timestamp, timezone.utc).replace(tzinfo=None).isoformat()
+        item.update(self.rest)
+        return item
+
+    def __repr__(self):
+        return f'{type(self).__name__}(id={getattr(self, "id", None)!r})'
+
+
+class Assigment(_Record):
+    _fields = ('id', 'task_suite_id', 'pool_id', 'user_id', 'status', 'reward', 'public_comment')
+    _time_fields = ('created', 'submitted', 'accepted', 'rejected', 'skipped', 'expired')
+    _lazy_fields = ('tasks', 'solutions', 'mixed', 'automerged', 'owner', 'first_declined_solution_attempt')
+    __slots__ = _fields + _time_fields
+
+
+class Task(_Record):
+    _fields = ('id', 'pool_id', 'overlap', 'remaining_overlap', 'infinite_overlap')
+    _time_fields = ('created', )
+    _lazy_fields = ('input_values', 'known_solutions', 'message_on_unknown_solution', 'origin_task_id',
+                    'baseline_solutions')
+    __slots__ = _fields + _time_fields
+
+
+class Pool(_Record):
+    _fields = ('id', 'project_id', 'private_name', 'status', 'type', 'priority', 'may_contain_adult_content')
+    _time_fields = ('created', 'last_started', 'last_stopped', 'will_expire')
+    _lazy_fields = ('defaults', 'filter', 'quality_control', 'assignments_issuing_config', 'reward_per_assignment',
+                    'auto_close_after_complete_delay_seconds', 'private_comment', 'public_description', 'mixer_config')
+    __slots__ = _fields + _time_fields
+
+
+class AssigmentBatch:
+    """
+    Columnar container of assigments.
+
+    Statuses are stored as indexes in ASSIGMENT_STATUSES, rewards and dates (unix timestamps, NaN if missing)
+    as typed arrays, user ids as shared strings. Other fields (tasks, solutions, ...) are encoded once,
+    zlib compressed and kept in one buffer of all assigments, they are decoded only when an Assigment
+    is taken from the batch.
+
+    Example:
+        batch = await client.get_assigments_batch(pool_id)
+        submitted = batch.status_counts()[AssigmentStatus.SUBMITTED]
+        first = batch[0].solutions
+    """
+    _time_fields = Assigment._time_fields
+    _columns = frozenset(('id', 'task_suite_id', 'user_id', 'pool_id', 'status', 'reward') + _time_fields)
+
+    def __init__(self, items: Iterable[dict] = (), compress_level: int = 1):
+        """compress_level: zlib level of encoded other fields, 0 keeps them uncompressed"""
+        self.compress_level = compress_level
+        self.ids: List[str] = []
+        self.task_suite_ids: List[str] = []
+        self.user_ids: List[str] = []
+        self.pool_ids = array('q')
+        self.statuses = array('b')
+        self.rewards = array('d')
+        self.times: Dict[str, array] = {name: array('d') for name in self._time_fields}
+        self._rest = bytearray()
+        self._rest_offsets = array('q', [0])
+        self._status_index = {status: i for i, status in enumerate(ASSIGMENT_STATUSES)}
+        self.extend(items)
+
+    def append(self, item: dict):
+        self.ids.append(item.get('id'))
+        self.task_suite_ids.append(item.get('task_suite_id'))
+        self.user_ids.append(_shared_str(item.get('user_id')))
+        self.pool_ids.append(int(item.get('pool_id') or 0))
+        self.statuses.append(self._status_index.get(item.get('status'), -1))  # type: ignore
+        self.rewards.append(float(item.get('reward') or 0))
+        for name, column in self.times.items():
+            timestamp = parse_timestamp(item.get(name))
+            column.append(float('nan') if timestamp is None else timestamp)
+        rest = {key: value for key, value in item.items() if key not in self._columns}
+        if rest:
+            blob = _codec.dumps(rest)
+            self._rest += zlib.compress(blob, self.compress_level) if self.compress_level else blob
+        self._rest_offsets.append(len(self._rest))
+
+    def extend(self, items: Iterable[dict]):
+        for item in items:
+            self.append(item)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def status(self, index: int) -> Optional[str]:
+        code = self.statuses[index]
+        return ASSIGMENT_STATUSES[code] if code >= 0 else None
+
+    def __getitem__(self, index: int) -> Assigment:
+        start, end = self._rest_offsets[index], self._rest_offsets[index + 1]
+        blob = bytes(self._rest[start:end])
+        if blob and self.compress_level:
+            blob = zlib.decompress(blob)
+        rest = _codec.loads(blob) if blob else {}
+        item = {
+            'id': self.ids[index],
+            'task_suite_id': self.task_suite_ids[index],
+            'user_id': self.user_ids[index],
+            'pool_id': self.pool_ids[index],
+            'status': self.status(index),
+            'reward': self.rewards[index],
+            **rest,
+        }
+        record = Assigment.from_dict(item)
+        for name, column in self.times.items():
+            timestamp = column[index]
+            setattr(record, name, None if timestamp != timestamp else timestamp)
+        return record
+
+    def __iter__(self) -> Iterator[Assigment]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def status_counts(self) -> Dict[str, int]:
+        counts = dict.fromkeys(ASSIGMENT_STATUSES, 0)
+        for code in self.statuses:
+            if code >= 0:
+                counts[ASSIGMENT_STATUSES[code]] += 1
+        return counts
@@ -0,0 +1,160 @@
+import asyncio
+import time
+from logging import Logger
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+from toloka_api.constants import (AVG_SUBMIT_ASSIGNMENT_MILLIS, REAL_TASKS_COUNT, UNIQUE_SUBMITTERS_COUNT,
+                                  PoolStatus)
+from toloka_api.exceptions import TolokaError
+
+log = Logger('Toloka api')
+
+DEFAULT_METRICS = (REAL_TASKS_COUNT, UNIQUE_SUBMITTERS_COUNT, AVG_SUBMIT_ASSIGNMENT_MILLIS)
+# seconds between refreshes of pool metrics by pool status, None - refresh only once
+DEFAULT_INTERVALS: Dict[str, Optional[float]] = {
+    PoolStatus.OPEN: 60.0,
+    PoolStatus.CLOSED: 1800.0,
+    PoolStatus.ARCHIVED: None,
+}
+
+
+class MetricValue(NamedTuple):
+    value: Any
+    updated_at: float
+
+
+class _MonitoredPool:
+    __slots__ = ('id', 'status', 'next_refresh')
+
+    def __init__(self, pool_id: str, status: Optional[str]):
+        self.id = pool_id
+        self.status = status
+        self.next_refresh = float('-inf')
+
+
+class AnalyticsMonitor:
+    """
+    Keep analytics metrics of many pools up to date with few requests.
+
+    Every refresh packs pool x metric queries of all due pools into analytics requests of up to batch_size
+    queries and waits for their operations together. Latest values are cached with unix time of update.
+    How often a pool is refreshed depends on its status (intervals), statuses are updated from the list
+    of open pools every status_interval seconds, pools that are not open are treated as closed.
+
+    Example:
+        monitor = AnalyticsMonitor(client, pool_ids)
+        await monitor.refresh()
+        monitor.get(pool_id, REAL_TASKS_COUNT).value
+        asyncio.ensure_future(monitor.run())
+    """
+
+    def __init__(self,
+                 client: Any,
+                 pool_ids: Iterable = (),
+                 metrics: Iterable[str] = DEFAULT_METRICS,
+                 intervals: Dict[str, Optional[float]] = None,
+                 batch_size: int = 100,
+                 status_interval: float = 300.0,
+                 timeout: float = 600.0):
+        self.client = client
+        self.metrics = tuple(metrics)
+        self.intervals = {**DEFAULT_INTERVALS, **(intervals or {})}
+        self.batch_size = batch_size
+        self.status_interval = status_interval
+        self.timeout = timeout
+        self._pools: Dict[str, _MonitoredPool] = {}
+        self._values: Dict[str, Dict[str, MetricValue]] = {}
+        self._statuses_at = float('-inf')
+        for pool_id in pool_ids:
+            self.add_pool(pool_id)
+
+    def add_pool(self, pool_id, status: str = None):
+        """Start monitoring pool, pool with unknown status is refreshed as open one"""
+        pool_id = str(pool_id)
+        if pool_id not in self._pools:
+            self._pools[pool_id] = _MonitoredPool(pool_id, status)
+
+    def remove_pool(self, pool_id):
+        self._pools.pop(str(pool_id), None)
+        self._values.pop(str(pool_id), None)
+
+    def get(self, pool_id, metric: str) -> Optional[MetricValue]:
+        return self._values.get(str(pool_id), {}).get(metric)
+
+    def values(self, pool_id) -> Dict[str, MetricValue]:
+        return dict(self._values.get(str(pool_id), {}))
+
+    def status(self, pool_id) -> Optional[str]:
+        pool = self._pools.get(str(pool_id))
+        return pool.status if pool is not None else None
+
+    def next_refresh(self) -> float:
+        """Seconds until the next pool is due"""
+        if not self._pools:
+            return float('inf')
+        return max(0.0, min(pool.next_refresh for pool in self._pools.values()) - time.monotonic())
+
+    async def refresh_statuses(self):
+        open_pools = set()
+        async for pool in self.client.iter_pools(status=PoolStatus.OPEN):
+            open_pools.add(str(pool['id']))
+        for pool in self._pools.values():
+            status = PoolStatus.OPEN if pool.id in open_pools else PoolStatus.CLOSED
+            if pool.status != status and pool.status != PoolStatus.ARCHIVED:
+                if pool.status is not None:
+                    pool.next_refresh = time.monotonic()
+                pool.status = status
+        self._statuses_at = time.monotonic()
+
+    async def refresh(self, force: bool = False) -> int:
+        """
+        Request metrics of due pools (all pools with force). Return number of refreshed pools.
+        """
+        if time.monotonic() - self._statuses_at >= self.status_interval:
+            try:
+                await self.refresh_statuses()
+            except TolokaError:
+                log.error('Pool statuses update failed', exc_info=True)
+        now = time.monotonic()
+        due = [pool for pool in self._pools.values() if force or pool.next_refresh <= now]
+        if not due:
+            return 0
+        queries = [{
+            'subject': 'POOL',
+            'subject_id': pool.id,
+            'name': metric
+        } for pool in due for metric in self.metrics]
+        batches = [queries[i:i + self.batch_size] for i in range(0, len(queries), self.batch_size)]
+        await asyncio.gather(*(self._request_batch(batch) for batch in batches))
+        for pool in due:
+            interval = self.intervals.get(pool.status or PoolStatus.OPEN)
+            pool.next_refresh = now + interval if interval is not None else float('inf')
+        return len(due)
+
+    async def _request_batch(self, queries: List[dict]):
+        try:
+            operation = await self.client.request_analytics(queries)
+            if not isinstance(operation, dict) or 'id' not in operation:
+                log.error(f'Analytics request failed: {operation}')
+                return
+            operation = await self.client.wait_operation(operation['id'], self.timeout)
+        except TolokaError:
+            log.error('Analytics request failed', exc_info=True)
+            return
+        if operation.get('status') != 'SUCCESS':
+            log.error(f'Analytics operation failed: {operation}')
+            return
+        updated_at = time.time()
+        for entry in (operation.get('details') or {}).get('value') or []:
+            request = entry.get('request') or {}
+            result = entry.get('result')
+            if isinstance(result, dict) and 'value' in result:
+                result = result['value']
+            pool_values = self._values.setdefault(str(request.get('subject_id')), {})
+            pool_values[request.get('name')] = MetricValue(result, updated_at)
+
+    async def run(self):
+        """Refresh metrics forever, cancel the task to stop"""
+        while True:
+            await self.refresh()
+            await asyncio.sleep(min(self.next_refresh(), self.status_interval))
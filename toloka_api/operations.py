@@ -0,0 +1,146 @@
+import asyncio
+import time
+from logging import Logger
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from toloka_api.exceptions import OperationNotFoundError, OperationTimeoutError, RequestError
+
+log = Logger('Toloka api')
+
+RUNNING_STATUSES = ('PENDING', 'RUNNING')
+
+
+class _WatchedOperation:
+    __slots__ = ('id', 'future', 'started', 'interval', 'next_poll', 'waiters', 'seen')
+
+    def __init__(self, operation_id: str, interval: float):
+        self.id = operation_id
+        self.future = asyncio.get_running_loop().create_future()
+        self.started = time.monotonic()
+        self.interval = interval
+        self.next_poll = self.started + interval
+        self.waiters = 0
+        self.seen = False
+
+
+class OperationWatcher:
+    """
+    Wait for many toloka operations with one background poller.
+
+    Polling interval of every operation adapts to it: when operation reports progress,
+    next poll is planned at half of estimated remaining time, otherwise interval grows by backoff.
+    Intervals stay in [min_interval, max_interval], not more than `concurrency` polls run at once.
+    Error answers without status (e.g. DOES_NOT_EXIST of operation registered late) are polled again,
+    operation never seen for not_found_timeout seconds fails with OperationNotFoundError.
+
+    Example:
+        watcher = OperationWatcher(client.get_operation_info)
+        operation = await watcher.wait(operation_id, timeout=600)
+    """
+
+    def __init__(self,
+                 get_operation_info: Callable[[str], Awaitable[Any]],
+                 min_interval: float = 1.0,
+                 max_interval: float = 60.0,
+                 backoff: float = 1.5,
+                 concurrency: int = 8,
+                 not_found_timeout: float = 30.0):
+        self.get_operation_info = get_operation_info
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.concurrency = concurrency
+        self.not_found_timeout = not_found_timeout
+        self._operations: Dict[str, _WatchedOperation] = {}
+        self._poller: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def __len__(self):
+        return len(self._operations)
+
+    def watch(self, operation_id: str) -> asyncio.Future:
+        """
+        Start watching operation. Return future resolved with operation info when it's finished.
+        """
+        operation = self._operations.get(operation_id)
+        if operation is None:
+            operation = self._operations[operation_id] = _WatchedOperation(operation_id, self.min_interval)
+        if self._poller is None or self._poller.done():
+            self._wakeup = asyncio.Event()
+            self._poller = asyncio.ensure_future(self._run())
+        else:
+            self._wakeup.set()  # type: ignore
+        return operation.future
+
+    async def wait(self, operation_id: str, timeout: Optional[float] = None) -> dict:
+        """
+        Wait until operation is finished and return its info.
+        Raise OperationTimeoutError after timeout seconds. Operation nobody waits for anymore is dropped.
+        """
+        future = self.watch(operation_id)
+        operation = self._operations.get(operation_id)
+        if operation is None:
+            return future.result()
+        operation.waiters += 1
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            raise OperationTimeoutError(operation_id, timeout) from None  # type: ignore
+        finally:
+            operation.waiters -= 1
+            if not operation.waiters and not future.done():
+                self._operations.pop(operation_id, None)
+                future.cancel()
+
+    def _next_interval(self, operation: _WatchedOperation, info: Any) -> float:
+        progress = info.get('progress') if isinstance(info, dict) else None
+        if progress:
+            elapsed = time.monotonic() - operation.started
+            interval = elapsed * (100 - progress) / progress / 2
+        else:
+            interval = operation.interval * self.backoff
+        return min(self.max_interval, max(self.min_interval, interval))
+
+    async def _poll(self, operation: _WatchedOperation, semaphore: asyncio.Semaphore):
+        async with semaphore:
+            try:
+                info = await self.get_operation_info(operation.id)
+            except RequestError:
+                log.error(f'Operation {operation.id} status request failed', exc_info=True)
+                info = None
+            except Exception as e:
+                self._operations.pop(operation.id, None)
+                if not operation.future.done():
+                    operation.future.set_exception(e)
+                return
+        if operation.future.done():
+            return
+        status = info.get('status') if isinstance(info, dict) else None
+        if status is not None:
+            operation.seen = True
+            if status not in RUNNING_STATUSES:
+                self._operations.pop(operation.id, None)
+                operation.future.set_result(info)
+                return
+        elif info is not None and not operation.seen:
+            if time.monotonic() - operation.started >= self.not_found_timeout:
+                self._operations.pop(operation.id, None)
+                operation.future.set_exception(OperationNotFoundError(operation.id, info))
+                return
+        operation.interval = self._next_interval(operation, info)
+        operation.next_poll = time.monotonic() + operation.interval
+
+    async def _run(self):
+        semaphore = asyncio.Semaphore(self.concurrency)
+        while self._operations:
+            now = time.monotonic()
+            due = [operation for operation in self._operations.values() if operation.next_poll <= now]
+            if due:
+                await asyncio.gather(*(self._poll(operation, semaphore) for operation in due))
+                continue
+            self._wakeup.clear()  # type: ignore
+            delay = min(operation.next_poll for operation in self._operations.values()) - now
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), delay)  # type: ignore
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,175 @@
+import asyncio
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Optional, Set
+
+Fetch = Callable[[dict], Awaitable[Any]]
+
+
+async def iter_cursor_pages(fetch: Fetch,
+                            params: dict,
+                            cursor_param: str = 'id_gt',
+                            cursor_field: str = 'id') -> AsyncIterator[List[dict]]:
+    """
+    Yield items of cursor paginated endpoint page by page.
+    Next page is requested before current one is yielded, so network and consumer work overlap
+    and not more than two pages are kept in memory.
+    """
+    next_page = None
+    try:
+        page = await fetch(params)
+        while True:
+            if page['has_more']:
+                params = {**params, cursor_param: page['items'][-1][cursor_field]}
+                next_page = asyncio.ensure_future(fetch(params))
+            yield page['items']
+            if next_page is None:
+                break
+            page, next_page = await next_page, None
+    finally:
+        if next_page is not None:
+            next_page.cancel()
+
+
+async def iter_numbered_pages(fetch: Fetch,
+                              params: dict,
+                              concurrency: int = 8,
+                              page_param: str = 'page',
+                              items_field: str = 'content',
+                              total_field: str = 'totalPages') -> AsyncIterator[List[dict]]:
+    """
+    Yield items of page-number paginated endpoint page by page, in order.
+    First page tells total number of pages, the rest are fetched concurrently,
+    not more than `concurrency` pages ahead of the consumer.
+    """
+    pending: deque = deque()
+    try:
+        first_page = await fetch({**params, page_param: 0})
+        next_index = 1
+        total = first_page[total_field]
+        yield first_page[items_field]
+        while next_index < total or pending:
+            while next_index < total and len(pending) < concurrency:
+                pending.append(asyncio.ensure_future(fetch({**params, page_param: next_index})))
+                next_index += 1
+            page = await pending[0]
+            pending.popleft()
+            yield page[items_field]
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def format_date(date: datetime) -> str:
+    """Format datetime the way toloka filters expect: UTC without timezone"""
+    if date.tzinfo is not None:
+        date = date.astimezone(timezone.utc).replace(tzinfo=None)
+    return date.isoformat(timespec='milliseconds')
+
+
+def parse_date(value: str) -> datetime:
+    return datetime.fromisoformat(value.rstrip('Z'))
+
+
+async def get_date_range(fetch: Fetch, params: dict, field: str = 'created') -> Optional[tuple]:
+    """
+    Return (first, last) `field` dates of items matching params, None if there are no items
+    """
+    first, last = await asyncio.gather(
+        fetch({**params, 'sort': field, 'limit': 1}),
+        fetch({**params, 'sort': f'-{field}', 'limit': 1}),
+    )
+    if not first['items'] or not last['items']:
+        return None
+    return parse_date(first['items'][0][field]), parse_date(last['items'][0][field])
+
+
+async def iter_partitioned_pages(fetch: Fetch,
+                                 params: dict,
+                                 start: Optional[datetime] = None,
+                                 end: Optional[datetime] = None,
+                                 shards: int = 8,
+                                 concurrency: Optional[int] = None,
+                                 field: str = 'created',
+                                 min_window: timedelta = timedelta(seconds=1),
+                                 cursor_param: str = 'id_gt',
+                                 cursor_field: str = 'id') -> AsyncIterator[List[dict]]:
+    """
+    Yield items with `field` in [start, end) page by page, walking time windows concurrently.
+
+    Range is split into `shards` windows of `field_gte`/`field_lt` filters, each window is walked
+    with usual id cursor. Window which doesn't fit into one page is dense: while fewer windows than workers
+    are queued, it's split in halves, which are queued for them. Items from its first page are yielded right away
+    and skipped when halves meet them again.
+    Pages of different windows are yielded as they arrive, so order is not preserved.
+    Missing start/end are taken from the first and the last matching items.
+    """
+    if start is None or end is None:
+        date_range = await get_date_range(fetch, params, field)
+        if date_range is None:
+            return
+        start = start or date_range[0]
+        end = end or date_range[1] + timedelta(milliseconds=1)
+    concurrency = concurrency or shards
+    windows: asyncio.Queue = asyncio.Queue()
+    output: asyncio.Queue = asyncio.Queue(maxsize=concurrency)
+    done = object()
+
+    step = (end - start) / shards
+    for i in range(shards):
+        windows.put_nowait((start + step * i, end if i == shards - 1 else start + step * (i + 1), frozenset()))
+
+    async def walk(window_start: datetime, window_end: datetime, skip: Set[Any]):
+        window_params = {**params, f'{field}_gte': format_date(window_start), f'{field}_lt': format_date(window_end)}
+        page = await fetch(window_params)
+        while True:
+            await output.put([item for item in page['items'] if item[cursor_field] not in skip])
+            if not page['has_more']:
+                break
+            few_windows_queued = windows.qsize() < concurrency
+            if few_windows_queued and cursor_param not in window_params and window_end - window_start >= min_window * 2:
+                middle = window_start + (window_end - window_start) / 2
+                seen = skip | {item[cursor_field] for item in page['items']}
+                windows.put_nowait((window_start, middle, seen))
+                windows.put_nowait((middle, window_end, seen))
+                break
+            window_params = {**window_params, cursor_param: page['items'][-1][cursor_field]}
+            page = await fetch(window_params)
+
+    async def worker():
+        while True:
+            window = await windows.get()
+            try:
+                await walk(*window)
+            except Exception as e:
+                await output.put(e)
+            finally:
+                windows.task_done()
+
+    async def finish():
+        await windows.join()
+        await output.put(done)
+
+    tasks = [asyncio.ensure_future(worker()) for _ in range(concurrency)]
+    tasks.append(asyncio.ensure_future(finish()))
+    try:
+        while True:
+            page = await output.get()
+            if page is done:
+                break
+            if isinstance(page, Exception):
+                raise page
+            if page:
+                yield page
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def iter_items(pages: AsyncIterator[List[dict]]) -> AsyncIterator[dict]:
+    try:
+        async for page in pages:
+            for item in page:
+                yield item
+    finally:
+        await pages.aclose()  # type: ignore
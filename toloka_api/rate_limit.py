@@ -0,0 +1,88 @@
+import asyncio
+import time
+from typing import Optional
+
+
+class RateLimiter:
+    """
+    Async token bucket shared by all requests of a client.
+
+    Limits requests per second and number of requests in flight.
+    Adapts to toloka limits: rate is cut by decrease_factor on every throttled response
+    (at most once per cooldown seconds) and grows back by increase_step after every successful one.
+
+    Example:
+        limiter = RateLimiter(rate=10, max_concurrency=20)
+        async with limiter:
+            await do_request()
+    """
+
+    def __init__(self,
+                 rate: float = 20.0,
+                 max_concurrency: int = 32,
+                 burst: Optional[float] = None,
+                 min_rate: float = 0.5,
+                 decrease_factor: float = 0.5,
+                 increase_step: Optional[float] = None,
+                 cooldown: float = 1.0):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst or rate
+        self.min_rate = min_rate
+        self.decrease_factor = decrease_factor
+        self.increase_step = increase_step or rate / 100
+        self.cooldown = cooldown
+        self.max_concurrency = max_concurrency
+        self._tokens = self.burst
+        self._updated_at = time.monotonic()
+        self._throttled_at = float('-inf')
+        self._lock = asyncio.Lock()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    async def _take_token(self):
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    async def acquire(self):
+        await self._semaphore.acquire()
+        try:
+            await self._take_token()
+        except BaseException:
+            self._semaphore.release()
+            raise
+
+    def release(self):
+        self._semaphore.release()
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.release()
+
+    def on_throttled(self):
+        """
+        Toloka answered TOO_MANY_REQUESTS: slow down and drop saved up tokens
+        """
+        now = time.monotonic()
+        self._refill()
+        self._tokens = min(self._tokens, 0)
+        if now - self._throttled_at >= self.cooldown:
+            self._throttled_at = now
+            self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+
+    def on_success(self):
+        if self.rate < self.max_rate:
+            self._refill()
+            self.rate = min(self.max_rate, self.rate + self.increase_step)
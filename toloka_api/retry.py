@@ -0,0 +1,79 @@
+import random
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Iterable, Optional
+
+from toloka_api.constants import TOO_MANY_REQUESTS
+
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+RETRY_STATUSES = frozenset({500, 502, 503, 504})
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse Retry-After header value (seconds or http-date) into seconds to wait
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return max(0.0, (date - datetime.now(timezone.utc)).total_seconds())
+
+
+def is_too_many_requests(status: Optional[int], result: Any) -> bool:
+    return status == 429 or (isinstance(result, dict) and result.get('code') == TOO_MANY_REQUESTS)
+
+
+class RetryPolicy:
+    """
+    Decide when request should be retried and how long to wait before next attempt.
+
+    Throttled requests (429 / TOO_MANY_REQUESTS) are retried for any method, because toloka
+    didn't process them. Transport errors and 5xx responses are retried only for idempotent methods,
+    so POST/PATCH are never sent twice after they could have been applied.
+    Delay is capped exponential backoff with full jitter, Retry-After header wins if it's longer.
+    """
+
+    def __init__(self,
+                 max_attempts: int = 15,
+                 backoff_base: float = 1.0,
+                 backoff_max: float = 60.0,
+                 jitter: bool = True,
+                 retry_after_max: float = 300.0,
+                 idempotent_methods: Iterable[str] = IDEMPOTENT_METHODS,
+                 retry_statuses: Iterable[int] = RETRY_STATUSES):
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.jitter = jitter
+        self.retry_after_max = retry_after_max
+        self.idempotent_methods = frozenset(m.upper() for m in idempotent_methods)
+        self.retry_statuses = frozenset(retry_statuses)
+
+    def is_retryable(self, method: str, status: Optional[int] = None, result: Any = None,
+                     error: Optional[BaseException] = None) -> bool:
+        if is_too_many_requests(status, result):
+            return True
+        if method.upper() not in self.idempotent_methods:
+            return False
+        return error is not None or status in self.retry_statuses
+
+    def get_delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """
+        Seconds to wait after `attempt` (counting from 1) failed
+        """
+        delay = min(self.backoff_max, self.backoff_base * 2**(attempt - 1))
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        hint = parse_retry_after(retry_after)
+        if hint is not None:
+            delay = max(delay, min(hint, self.retry_after_max))
+        return delay
@@ -0,0 +1,108 @@
+import asyncio
+import heapq
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from toloka_api.constants import RequestPriority
+from toloka_api.rate_limit import RateLimiter
+
+DEFAULT_WEIGHTS = {
+    RequestPriority.INTERACTIVE: 16.0,
+    RequestPriority.NORMAL: 4.0,
+    RequestPriority.BULK: 1.0,
+}
+PAGE_PARAMS = ('limit', 'page', 'size')
+
+_priority: ContextVar[Optional[str]] = ContextVar('toloka_request_priority', default=None)
+
+
+@contextmanager
+def request_priority(priority: str) -> Iterator[None]:
+    """
+    Send requests made inside the block with given priority, it wins over defaults of client methods:
+        with request_priority(RequestPriority.INTERACTIVE):
+            await client.get_pool(pool_id)
+    Tasks started inside the block keep the priority.
+    """
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class RequestScheduler:
+    """
+    Weighted fair queue in front of rate limiter: waiting requests get concurrency slots and rate tokens
+    in proportion to weights of their priority classes, so interactive calls don't wait behind bulk
+    pagination. A class without waiting requests doesn't take anything from others.
+
+    Priority of request: request_priority() block, then priority passed by client method,
+    then list page requests (with limit, page or size params) are BULK and the rest are NORMAL.
+    """
+
+    def __init__(self, rate_limiter: RateLimiter = None, weights: Dict[str, float] = None):
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.weights = dict(weights or DEFAULT_WEIGHTS)
+        self._queue: List[Tuple[float, int, float, asyncio.Future]] = []
+        self._finish: Dict[str, float] = {}
+        self._virtual_time = 0.0
+        self._counter = 0
+        self._dispatcher: Optional[asyncio.Future] = None
+
+    def priority(self, method: str, path: str, priority: Optional[str] = None, params: Any = None) -> str:
+        priority = _priority.get() or priority
+        if priority is None:
+            is_page = method == 'GET' and isinstance(params, dict) and any(p in params for p in PAGE_PARAMS)
+            priority = RequestPriority.BULK if is_page else RequestPriority.NORMAL
+        if priority not in self.weights:
+            raise ValueError(f'Unknown request priority {priority}, expected one of {list(self.weights)}')
+        return priority
+
+    async def acquire(self, priority: str = RequestPriority.NORMAL):
+        start = max(self._virtual_time, self._finish.get(priority, 0.0))
+        finish = self._finish[priority] = start + 1 / self.weights[priority]
+        future = asyncio.get_running_loop().create_future()
+        self._counter += 1
+        heapq.heappush(self._queue, (finish, self._counter, start, future))
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.ensure_future(self._dispatch())
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.rate_limiter.release()
+            raise
+
+    def release(self):
+        self.rate_limiter.release()
+
+    def slot(self, priority: str = RequestPriority.NORMAL) -> '_Slot':
+        return _Slot(self, priority)
+
+    async def _dispatch(self):
+        while self._queue:
+            await self.rate_limiter.acquire()
+            while self._queue:
+                _, _, start, future = heapq.heappop(self._queue)
+                if not future.done():
+                    self._virtual_time = start
+                    future.set_result(None)
+                    break
+            else:
+                self.rate_limiter.release()
+
+
+class _Slot:
+    __slots__ = ('scheduler', 'priority')
+
+    def __init__(self, scheduler: RequestScheduler, priority: str):
+        self.scheduler = scheduler
+        self.priority = priority
+
+    async def __aenter__(self):
+        await self.scheduler.acquire(self.priority)
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.scheduler.release()
@@ -0,0 +1,28 @@
+from dataclasses import dataclass
+from typing import List, Optional
+
+from aiohttp import ClientSession, TCPConnector, TraceConfig
+
+
+@dataclass
+class ConnectionSettings:
+    """
+    Connection pool settings of a session created by the client itself.
+    Connections are kept alive and reused, so TLS handshake is made once per connection, not per request.
+    """
+    limit: int = 100
+    limit_per_host: int = 64
+    keepalive_timeout: float = 60.0
+    ttl_dns_cache: int = 300
+
+    def create_connector(self) -> TCPConnector:
+        return TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            use_dns_cache=True,
+            ttl_dns_cache=self.ttl_dns_cache,
+        )
+
+    def create_session(self, trace_configs: Optional[List[TraceConfig]] = None) -> ClientSession:
+        return ClientSession(connector=self.create_connector(), trace_configs=trace_configs)
@@ -0,0 +1,93 @@
+import sqlite3
+from typing import Any, Dict, Iterator, List, Optional
+
+from toloka_api.codec import JsonCodec, default_codec
+
+ID_CURSOR = 'id'
+
+
+class AssigmentStore:
+    """
+    SQLite store of synced asigments and per pool sync checkpoints.
+
+    Checkpoints are high-water marks: last seen asigment id and the latest seen date
+    of every tracked date tag (submitted, accepted, ...).
+    Sync saves asigments it found together with checkpoint by commit() only after it succeeded,
+    so asigments of a failed sync are found and returned again by the next one.
+    """
+
+    def __init__(self, path: str, codec: JsonCodec = None):
+        self.codec = codec or default_codec()
+        self._db = sqlite3.connect(path)
+        with self._db:
+            self._db.execute('CREATE TABLE IF NOT EXISTS assigments '
+                             '(id TEXT PRIMARY KEY, pool_id TEXT, status TEXT, body BLOB)')
+            self._db.execute('CREATE INDEX IF NOT EXISTS assigments_pool_status ON assigments (pool_id, status)')
+            self._db.execute('CREATE TABLE IF NOT EXISTS checkpoints '
+                             '(pool_id TEXT, cursor TEXT, value TEXT, PRIMARY KEY (pool_id, cursor))')
+
+    def checkpoint(self, pool_id) -> Dict[str, str]:
+        """Return {cursor: value} of the pool, empty dict if pool was never synced"""
+        rows = self._db.execute('SELECT cursor, value FROM checkpoints WHERE pool_id = ?', (str(pool_id), ))
+        return dict(rows.fetchall())
+
+    def save_checkpoint(self, pool_id, checkpoint: Dict[str, str]):
+        with self._db:
+            self._save_checkpoint(pool_id, checkpoint)
+
+    def _save_checkpoint(self, pool_id, checkpoint: Dict[str, str]):
+        self._db.executemany('INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?)',
+                             [(str(pool_id), cursor, value) for cursor, value in checkpoint.items()])
+
+    def changed(self, items: List[dict]) -> List[dict]:
+        """
+        Return asigments which are new or whose status differs from saved one, nothing is saved.
+        """
+        changed = []
+        for start in range(0, len(items), 500):
+            chunk = items[start:start + 500]
+            rows = self._db.execute(
+                f'SELECT id, status FROM assigments WHERE id IN ({",".join("?" * len(chunk))})',
+                [str(item['id']) for item in chunk],
+            )
+            statuses = dict(rows.fetchall())
+            changed.extend(item for item in chunk if statuses.get(str(item['id'])) != item.get('status'))
+        return changed
+
+    def _save(self, items: List[dict]):
+        self._db.executemany('INSERT OR REPLACE INTO assigments VALUES (?, ?, ?, ?)', [
+            (str(item['id']), str(item.get('pool_id')), item.get('status'), self.codec.dumps(item)) for item in items
+        ])
+
+    def upsert(self, items: List[dict]) -> List[dict]:
+        """
+        Save asigments. Return new ones and ones whose status is changed.
+        """
+        with self._db:
+            changed = self.changed(items)
+            self._save(changed)
+        return changed
+
+    def commit(self, pool_id, items: List[dict], checkpoint: Dict[str, str]):
+        """
+        Save asigments and pool checkpoint in one transaction, so either both are saved or none.
+        """
+        with self._db:
+            self._save(items)
+            self._save_checkpoint(pool_id, checkpoint)
+
+    def get(self, assigment_id: str) -> Optional[dict]:
+        row = self._db.execute('SELECT body FROM assigments WHERE id = ?', (str(assigment_id), )).fetchone()
+        return self.codec.loads(row[0]) if row else None
+
+    def iter_assigments(self, pool_id, status: str = None) -> Iterator[dict]:
+        query = 'SELECT body FROM assigments WHERE pool_id = ?'
+        args: List[Any] = [str(pool_id)]
+        if status is not None:
+            query += ' AND status = ?'
+            args.append(status)
+        for body, in self._db.execute(query, args):
+            yield self.codec.loads(body)
+
+    def close(self):
+        self._db.close()